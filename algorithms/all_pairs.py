@@ -0,0 +1,149 @@
+import os
+from array import array
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+from graph import Graph, GraphError
+from compact_graph import CompactGraph
+from algorithms.dijkstra_algorithm import _dijkstra_ids
+from algorithms.floyd_warshall_algorithm import floyd_warshall
+from algorithms.johnson_algorithm import _reweight, _restore_row
+
+# Плотность (E / V^2), начиная с которой Флойд-Уоршелл выгоднее V запусков Дейкстры;
+# для k источников порог растёт в V / k раз
+DENSE_THRESHOLD = 0.25
+# Сколько источников отправлять в процесс за одну задачу
+CHUNK_SIZE = 64
+
+# Состояние рабочего процесса: CSR-массивы графа, отображённые из общей памяти
+_worker_state = {}
+
+
+def all_pairs_shortest_paths(graph: Union[Graph, CompactGraph], workers: Optional[int] = None,
+                             method: str = 'auto',
+                             sources: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, dict]]:
+    """Кратчайшие расстояния между всеми парами вершин.
+
+    Результат выдаётся потоково: пары (источник, {вершина: расстояние}) по мере
+    готовности строк, поэтому порядок источников при workers > 1 не гарантирован.
+    method: 'auto', 'dijkstra', 'johnson' или 'floyd_warshall'.
+    """
+    if isinstance(graph, Graph):
+        graph = graph.freeze()
+    if not graph.weighted:
+        raise GraphError("Поиск кратчайших путей между всеми парами применим только к взвешенным графам.")
+
+    if sources is None:
+        source_ids = range(graph.vertex_count)
+    else:
+        source_ids = [graph.vertex_id(s) for s in sources]
+
+    if method == 'auto':
+        method = _choose_method(graph, len(source_ids))
+
+    if method == 'floyd_warshall':
+        yield from _floyd_warshall_rows(graph, source_ids)
+    elif method == 'dijkstra':
+        if graph.has_negative_weights():
+            raise GraphError("Алгоритм Дейкстры не работает с отрицательными весами рёбер.")
+        yield from _dijkstra_rows(graph, source_ids, workers)
+    elif method == 'johnson':
+        reweighted, potentials = _reweight(graph)
+        for name, row in _dijkstra_rows(reweighted, source_ids, workers, raw=True):
+            yield name, _restore_row(reweighted, potentials, reweighted.index[name], row)
+    else:
+        raise GraphError(f"Неизвестный метод поиска кратчайших путей: '{method}'.")
+
+
+def _choose_method(graph: CompactGraph, sources: int) -> str:
+    # Флойд-Уоршелл стоит O(V^3) при любом числе источников, k запусков Дейкстры — O(k E log V):
+    # k * E >= DENSE_THRESHOLD * V^3 при k = V совпадает с порогом плотности
+    n = graph.vertex_count
+    if n and sources * graph.edge_count >= DENSE_THRESHOLD * n ** 3:
+        return 'floyd_warshall'
+    if graph.has_negative_weights():
+        return 'johnson'
+    return 'dijkstra'
+
+
+def _floyd_warshall_rows(graph: CompactGraph, source_ids) -> Iterator[Tuple[str, dict]]:
+    try:
+        import numpy  # noqa: F401
+        engine = 'numpy'
+    except ImportError:
+        engine = 'python'
+    dist = floyd_warshall(graph, engine=engine)
+    for s in source_ids:
+        name = graph.vertices[s]
+        yield name, dist[name]
+
+
+def _dijkstra_rows(graph: CompactGraph, source_ids, workers: Optional[int],
+                   raw: bool = False) -> Iterator[Tuple[str, dict]]:
+    # raw=True отдаёт строки как последовательности расстояний по номерам вершин
+    vertices = graph.vertices
+    to_row = (lambda row: row) if raw else (lambda row: dict(zip(vertices, row)))
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(source_ids) <= CHUNK_SIZE:
+        for s in source_ids:
+            yield vertices[s], to_row(_dijkstra_ids(graph.offsets, graph.targets, graph.weights, s))
+        return
+
+    # Пул процессов и общая память нужны только здесь; не замедляем импорт модуля
+    from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+    shm, layout = _share_graph(graph)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shm.name, layout)) as executor:
+            chunks = (source_ids[i:i + CHUNK_SIZE] for i in range(0, len(source_ids), CHUNK_SIZE))
+            pending = set()
+            # Держим в работе не больше двух задач на процесс, чтобы не копить результаты в памяти
+            for chunk in chunks:
+                pending.add(executor.submit(_worker_rows, list(chunk)))
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        for s, row in future.result():
+                            yield vertices[s], to_row(row)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for s, row in future.result():
+                        yield vertices[s], to_row(row)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _share_graph(graph: CompactGraph):
+    # Раскладка буфера: offsets (int64) | targets (int32, с выравниванием до 8 байт) | weights (float64)
+    n_offsets = len(graph.offsets)
+    n_edges = graph.edge_count
+    targets_start = 8 * n_offsets
+    weights_start = targets_start + ((4 * n_edges + 7) & ~7)
+    size = weights_start + 8 * n_edges
+
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    shm.buf[:targets_start] = memoryview(graph.offsets).cast('B')
+    shm.buf[targets_start:targets_start + 4 * n_edges] = memoryview(graph.targets).cast('B')
+    shm.buf[weights_start:size] = memoryview(graph.weights).cast('B')
+    return shm, (n_offsets, n_edges, targets_start, weights_start)
+
+
+def _init_worker(name: str, layout):
+    n_offsets, n_edges, targets_start, weights_start = layout
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=name)
+    _worker_state['shm'] = shm
+    _worker_state['offsets'] = shm.buf[:targets_start].cast('q')
+    _worker_state['targets'] = shm.buf[targets_start:targets_start + 4 * n_edges].cast('i')
+    _worker_state['weights'] = shm.buf[weights_start:weights_start + 8 * n_edges].cast('d')
+
+
+def _worker_rows(source_ids):
+    offsets = _worker_state['offsets']
+    targets = _worker_state['targets']
+    weights = _worker_state['weights']
+    return [(s, array('d', _dijkstra_ids(offsets, targets, weights, s))) for s in source_ids]
@@ -1,6 +1,22 @@
-from graph import Graph, GraphError
+import time
+from array import array
+from collections import deque
+from typing import List, Optional, Union
+from graph import Graph, GraphError, NegativeCycleError
+from compact_graph import CompactGraph
+from algorithms.result_cache import cached
+from algorithms.stats import AlgorithmStats
+from algorithms.paths import ShortestPathTree
+
+def bellman_ford(graph: Union[Graph, CompactGraph], start: str, use_cache: bool = False,
+                 stats: Optional[AlgorithmStats] = None, with_predecessors: bool = False):
+    # with_predecessors=True возвращает пару (расстояния, ShortestPathTree)
+    if use_cache and not with_predecessors:
+        return cached(graph, ('bellman_ford', start), lambda: bellman_ford(graph, start, stats=stats), stats, start)
+
+    if isinstance(graph, CompactGraph):
+        return _bellman_ford_compact(graph, start, stats, with_predecessors)
 
-def bellman_ford(graph: Graph, start: str) -> dict:
     if not graph.weighted:
         raise GraphError("Алгоритм Форда-Беллмана применим только к взвешенным графам.")
 
@@ -9,19 +25,29 @@ def bellman_ford(graph: Graph, start: str) -> dict:
 
     distances = {vertex: float('inf') for vertex in graph.adjacency_list}
     distances[start] = 0
+    parents = dict.fromkeys(graph.adjacency_list) if with_predecessors else None
+    if stats is not None:
+        started = time.perf_counter()
+    rounds = updates = 0
 
-    for _ in range(len(graph.adjacency_list) - 1):
-        updated = False
+    # updated — число улучшений за раунд: оно же признак, что раунд что-то изменил
+    for rounds in range(1, len(graph.adjacency_list)):
+        updated = 0
         for u in graph.adjacency_list:
             for v, weight in graph.adjacency_list[u]:
                 if weight is None:
                     continue
                 if distances[u] + weight < distances[v]:
                     distances[v] = distances[u] + weight
-                    updated = True
+                    if parents is not None:
+                        parents[v] = u
+                    updated += 1
+        updates += updated
         if not updated:
             break
 
+    if stats is not None:
+        relaxed = time.perf_counter()
     # Проверка на наличие цикла отрицательного веса
     for u in graph.adjacency_list:
         for v, weight in graph.adjacency_list[u]:
@@ -30,4 +56,171 @@ def bellman_ford(graph: Graph, start: str) -> dict:
             if distances[u] + weight < distances[v]:
                 raise GraphError("Обнаружен цикл отрицательного веса. Алгоритм Форда-Беллмана не может быть применён.")
 
+    if stats is not None:
+        edges = sum(len(edges) for edges in graph.adjacency_list.values())
+        _record_stats(stats, start, rounds, updates, rounds * edges, started, relaxed)
+    if with_predecessors:
+        return distances, ShortestPathTree.from_dict(parents, start)
     return distances
+
+
+def _record_stats(stats: AlgorithmStats, start: str, rounds: int, updates: int, checks: int,
+                  started: float, relaxed: float):
+    stats.record('bellman_ford', {
+        'rounds': rounds,
+        'edge_checks': checks,
+        'distance_updates': updates,
+    }, {'relaxation': relaxed - started, 'negative_cycle_check': time.perf_counter() - relaxed}, start)
+
+
+def _bellman_ford_compact(graph: CompactGraph, start: str, stats: Optional[AlgorithmStats] = None,
+                          with_predecessors: bool = False):
+    if not graph.weighted:
+        raise GraphError("Алгоритм Форда-Беллмана применим только к взвешенным графам.")
+
+    if start not in graph.index:
+        raise GraphError(f"Начальная вершина '{start}' не найдена в графе.")
+
+    n = graph.vertex_count
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    distances = [float('inf')] * n
+    distances[graph.index[start]] = 0
+    parents = array('i', [-1]) * n if with_predecessors else None
+    if stats is not None:
+        started = time.perf_counter()
+    rounds = updates = 0
+
+    for rounds in range(1, n):
+        updated = 0
+        for u in range(n):
+            du = distances[u]
+            if du == float('inf'):
+                continue
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                if du + weights[e] < distances[v]:
+                    distances[v] = du + weights[e]
+                    if parents is not None:
+                        parents[v] = u
+                    updated += 1
+        updates += updated
+        if not updated:
+            break
+
+    if stats is not None:
+        relaxed = time.perf_counter()
+    # Проверка на наличие цикла отрицательного веса
+    for u in range(n):
+        for e in range(offsets[u], offsets[u + 1]):
+            if distances[u] + weights[e] < distances[targets[e]]:
+                raise GraphError("Обнаружен цикл отрицательного веса. Алгоритм Форда-Беллмана не может быть применён.")
+
+    if stats is not None:
+        # Верхняя оценка: рёбра вершин, до которых путь ещё не найден, в раунде пропускаются
+        checks = rounds * sum(offsets[u + 1] - offsets[u] for u in range(n) if distances[u] != float('inf'))
+        _record_stats(stats, start, rounds, updates, checks, started, relaxed)
+    if with_predecessors:
+        return dict(zip(graph.vertices, distances)), ShortestPathTree(graph.vertices, graph.index, start, parents)
+    return dict(zip(graph.vertices, distances))
+
+
+def spfa(graph: Union[Graph, CompactGraph], start: str, max_rounds: Optional[int] = None,
+         time_budget: Optional[float] = None, stats: Optional[AlgorithmStats] = None,
+         with_predecessors: bool = False):
+    """Форд-Беллман с очередью (SPFA): релаксируются только рёбра вершин, чьё расстояние изменилось.
+
+    Раунд — обработка всех вершин, попавших в очередь на предыдущем раунде.
+    При цикле отрицательного веса бросает NegativeCycleError со списком вершин цикла.
+    with_predecessors=True возвращает пару (расстояния, ShortestPathTree).
+    """
+    if isinstance(graph, Graph):
+        graph = graph.freeze()
+
+    if not graph.weighted:
+        raise GraphError("Алгоритм Форда-Беллмана применим только к взвешенным графам.")
+
+    if start not in graph.index:
+        raise GraphError(f"Начальная вершина '{start}' не найдена в графе.")
+
+    n = graph.vertex_count
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    source = graph.index[start]
+    distances = [float('inf')] * n
+    distances[source] = 0
+    predecessors = [-1] * n
+    relaxations = [0] * n
+    in_queue = bytearray(n)
+
+    queue = deque([source])
+    in_queue[source] = 1
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+    rounds = 0
+    round_left = 1
+    pops = 0
+    checks = 0
+    if stats is not None:
+        started = time.perf_counter()
+
+    while queue:
+        if round_left == 0:
+            rounds += 1
+            if max_rounds is not None and rounds >= max_rounds:
+                raise GraphError(f"Алгоритм Форда-Беллмана не сошёлся за {max_rounds} раундов.")
+            round_left = len(queue)
+        round_left -= 1
+
+        pops += 1
+        if deadline is not None and pops & 1023 == 0 and time.monotonic() > deadline:
+            raise GraphError("Превышен лимит времени алгоритма Форда-Беллмана.")
+
+        u = queue.popleft()
+        in_queue[u] = 0
+        du = distances[u]
+        checks += offsets[u + 1] - offsets[u]
+
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            if du + weights[e] < distances[v]:
+                distances[v] = du + weights[e]
+                predecessors[v] = u
+                relaxations[v] += 1
+                # Вершину нельзя улучшить больше n - 1 раз без цикла отрицательного веса
+                if relaxations[v] >= n and relaxations[v] % n == 0:
+                    cycle = _find_cycle(predecessors, v, n)
+                    if cycle:
+                        names = [graph.vertices[x] for x in cycle]
+                        raise NegativeCycleError(
+                            "Обнаружен цикл отрицательного веса: " + " -> ".join(names + names[:1]) + ".",
+                            names)
+                if not in_queue[v]:
+                    in_queue[v] = 1
+                    queue.append(v)
+
+    if stats is not None:
+        stats.record('spfa', {
+            'rounds': rounds + 1,
+            'queue_pops': pops,
+            'edge_checks': checks,
+            'distance_updates': sum(relaxations),
+        }, {'search': time.perf_counter() - started}, start)
+    if with_predecessors:
+        return dict(zip(graph.vertices, distances)), ShortestPathTree(graph.vertices, graph.index, start,
+                                                                      array('i', predecessors))
+    return dict(zip(graph.vertices, distances))
+
+
+def _find_cycle(predecessors: List[int], v: int, n: int) -> List[int]:
+    # После n шагов по предкам из v мы гарантированно внутри цикла, если он есть
+    for _ in range(n):
+        v = predecessors[v]
+        if v == -1:
+            return []
+    cycle = [v]
+    u = predecessors[v]
+    while u != v:
+        if u == -1:
+            return []
+        cycle.append(u)
+        u = predecessors[u]
+    cycle.reverse()
+    return cycle
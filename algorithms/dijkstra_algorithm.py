@@ -1,14 +1,70 @@
 import heapq
+import math
+import time
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 from graph import Graph, GraphError
+from compact_graph import CompactGraph
+from algorithms.result_cache import cached
+from algorithms.stats import AlgorithmStats, CallCounter
+from algorithms.priority_queues import IndexedHeap, BucketQueue
+from algorithms.paths import ShortestPathTree
+
+# Очереди с приоритетом: ленивая куча heapq, индексированная куча с уменьшением ключа
+# и корзины Дайала (только целые веса не больше DIAL_MAX_WEIGHT)
+QUEUES = ('heap', 'indexed', 'dial')
+DIAL_MAX_WEIGHT = 1 << 16
+
+def dijkstra(graph: Union[Graph, CompactGraph], start: Union[str, Iterable[str]], track_steps: bool = False,
+             use_cache: bool = False, stats: Optional[AlgorithmStats] = None, queue: str = 'heap',
+             max_distance: Optional[float] = None, max_settled: Optional[int] = None,
+             return_sources: bool = False, with_predecessors: bool = False,
+             checkpoint_interval: Optional[int] = None):
+    """Кратчайшие расстояния от start.
+
+    start может быть списком вершин: расстояние считается до ближайшей из них,
+    а при return_sources=True возвращается ещё словарь {вершина: ближайший источник}.
+    max_distance и max_settled останавливают поиск после вершин на расстоянии больше
+    max_distance или после max_settled окончательно обработанных вершин; тогда
+    в результате только достигнутые вершины в порядке неубывания расстояния.
+    Кэш (use_cache) применяется только к обычному запросу от одной вершины.
+    with_predecessors=True добавляет к результату последним элементом
+    ShortestPathTree для восстановления путей.
+    checkpoint_interval — через сколько шагов записи (track_steps=True) сохранять
+    полное состояние; по умолчанию около √V.
+    """
+    bounded = max_distance is not None or max_settled is not None
+    if bounded or return_sources or not isinstance(start, str):
+        if track_steps or queue != 'heap':
+            raise GraphError("Несколько источников и ограничения поиска не поддерживают запись шагов "
+                             "и очереди, кроме 'heap'.")
+        if with_predecessors:
+            raise GraphError("Дерево путей строится только для запроса от одной вершины без ограничений.")
+        return _dijkstra_multi(graph, [start] if isinstance(start, str) else list(start),
+                               max_distance, max_settled, return_sources, stats)
+
+    # use_cache=True берёт расстояния из кэша графа, пока граф не изменился (запись шагов не кэшируется)
+    if use_cache and not track_steps and not with_predecessors:
+        return cached(graph, ('dijkstra', start), lambda: dijkstra(graph, start, stats=stats, queue=queue),
+                      stats, start)
+
+    if queue not in QUEUES:
+        raise GraphError(f"Неизвестная очередь с приоритетом: '{queue}'.")
+
+    if isinstance(graph, CompactGraph) or queue != 'heap':
+        if track_steps:
+            raise GraphError("Запись шагов поддерживается только для обычного графа и очереди 'heap'.")
+        if isinstance(graph, Graph):
+            if not graph.weighted:
+                raise GraphError("Алгоритм Дейкстры применим только к взвешенным графам.")
+            graph = graph.freeze()
+        return _dijkstra_compact(graph, start, stats, queue, with_predecessors)
 
-def dijkstra(graph: Graph, start: str, track_steps: bool = False):
     if not graph.weighted:
         raise GraphError("Алгоритм Дейкстры применим только к взвешенным графам.")
 
-    for u in graph.adjacency_list:
-        for v, weight in graph.adjacency_list[u]:
-            if weight is not None and weight < 0:
-                raise GraphError("Алгоритм Дейкстры не работает с отрицательными весами рёбер.")
+    if graph.has_negative_weights():
+        raise GraphError("Алгоритм Дейкстры не работает с отрицательными весами рёбер.")
 
     if start not in graph.adjacency_list:
         raise GraphError(f"Начальная вершина '{start}' не найдена в графе.")
@@ -16,9 +72,14 @@ def dijkstra(graph: Graph, start: str, track_steps: bool = False):
     distances = {vertex: float('inf') for vertex in graph.adjacency_list}
     distances[start] = 0
     visited = set()
-    steps = []
+    steps = DijkstraTrace(distances, checkpoint_interval) if track_steps else None
+    parents = dict.fromkeys(graph.adjacency_list) if with_predecessors else None
 
     priority_queue = [(0, start)]
+    push = heapq.heappush
+    if stats is not None:
+        started = time.perf_counter()
+        push = CallCounter(push)
 
     while priority_queue:
         current_distance, current_vertex = heapq.heappop(priority_queue)
@@ -27,27 +88,462 @@ def dijkstra(graph: Graph, start: str, track_steps: bool = False):
             continue
         visited.add(current_vertex)
 
-        updated_edges = set()
+        changes = []
 
         for neighbor, weight in graph.adjacency_list[current_vertex]:
             if weight is None:
                 continue
             new_distance = current_distance + weight
             if new_distance < distances[neighbor]:
+                if track_steps:
+                    changes.append((neighbor, distances[neighbor], new_distance))
                 distances[neighbor] = new_distance
-                heapq.heappush(priority_queue, (new_distance, neighbor))
-                updated_edges.add((current_vertex, neighbor))
+                if parents is not None:
+                    parents[neighbor] = current_vertex
+                push(priority_queue, (new_distance, neighbor))
 
         if track_steps:
-            steps.append({
-                'current': current_vertex,
-                'distances': distances.copy(),
-                'visited': visited.copy(),
-                'updated_edges': updated_edges.copy(),
-            })
+            steps.record(current_vertex, changes)
 
+    if stats is not None:
+        scanned = sum(len(graph.adjacency_list[u]) for u in visited)
+        _record_stats(stats, start, len(visited), push.calls, scanned, time.perf_counter() - started)
+
+    result = (distances,)
     if track_steps:
-        return distances, steps
+        result += (steps,)
+    if with_predecessors:
+        result += (ShortestPathTree.from_dict(parents, start),)
+    return result if len(result) > 1 else distances
+
+
+def _dijkstra_multi(graph: Union[Graph, CompactGraph], sources: List[str], max_distance: Optional[float],
+                    max_settled: Optional[int], return_sources: bool, stats: Optional[AlgorithmStats]):
+    if not graph.weighted:
+        raise GraphError("Алгоритм Дейкстры применим только к взвешенным графам.")
+    if graph.has_negative_weights():
+        raise GraphError("Алгоритм Дейкстры не работает с отрицательными весами рёбер.")
+    if not sources:
+        raise GraphError("Не задано ни одной начальной вершины.")
+    if max_settled is not None and max_settled <= 0:
+        raise GraphError("Число обрабатываемых вершин должно быть положительным.")
+
+    if isinstance(graph, CompactGraph):
+        index, vertices = graph.index, graph.vertices
+        offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+
+        def adjacent(u):
+            lo, hi = offsets[u], offsets[u + 1]
+            return zip(targets[lo:hi], weights[lo:hi])
+    else:
+        index = vertices = None
+        adjacent = graph.adjacency_list.__getitem__
+
+    for source in sources:
+        if (index is None and source not in graph.adjacency_list) or (index is not None and source not in index):
+            raise GraphError(f"Начальная вершина '{source}' не найдена в графе.")
+    keys = list(dict.fromkeys(sources if index is None else (index[s] for s in sources)))
+
+    if stats is None:
+        settled, nearest = _bounded_search(adjacent, keys, max_distance, max_settled)
+    else:
+        started = time.perf_counter()
+        push, pop = CallCounter(heapq.heappush), CallCounter(heapq.heappop)
+        settled, nearest = _bounded_search(adjacent, keys, max_distance, max_settled, push, pop)
+        stats.record('dijkstra', {
+            'sources': len(keys),
+            'settled': len(settled),
+            'heap_pushes': len(keys) + push.calls,
+            'heap_pops': pop.calls,
+            'stale_pops': pop.calls - len(settled),
+        }, {'search': time.perf_counter() - started}, ", ".join(sources))
+
+    if vertices is not None:
+        settled = {vertices[u]: d for u, d in settled.items()}
+        nearest = {vertices[u]: vertices[s] for u, s in nearest.items()}
+    if max_distance is None and max_settled is None:
+        # Без ограничений — все вершины графа, как у обычного запуска
+        inf = float('inf')
+        names = vertices if vertices is not None else graph.adjacency_list
+        settled = {v: settled.get(v, inf) for v in names}
+        nearest = {v: nearest.get(v) for v in names}
+    else:
+        nearest = {v: nearest[v] for v in settled}
+    if return_sources:
+        return settled, nearest
+    return settled
+
+
+def _bounded_search(adjacent, sources: list, max_distance: Optional[float], max_settled: Optional[int],
+                    push=heapq.heappush, pop=heapq.heappop):
+    # Дейкстра от нескольких источников со словарями вместо массивов: память и время
+    # пропорциональны достигнутой части графа, а не всему графу
+    inf = float('inf')
+    limit = inf if max_distance is None else max_distance
+    tentative = dict.fromkeys(sources, 0)
+    nearest = {s: s for s in sources}
+    settled = {}
+    heap = [(0, s) for s in sources]
+    heapq.heapify(heap)
+
+    while heap:
+        d, u = pop(heap)
+        if u in settled:
+            continue
+        if d > limit:
+            break
+        settled[u] = d
+        if max_settled is not None and len(settled) >= max_settled:
+            break
+        for v, weight in adjacent(u):
+            new_distance = d + weight
+            if new_distance <= limit and new_distance < tentative.get(v, inf):
+                tentative[v] = new_distance
+                nearest[v] = nearest[u]
+                push(heap, (new_distance, v))
+    return settled, nearest
+
+
+class DijkstraTrace:
+    """Журнал шагов алгоритма Дейкстры.
+
+    Для каждого шага хранится только обработанная вершина и изменённые
+    расстояния; полное состояние шага восстанавливается по запросу от
+    ближайшей контрольной точки или от последнего запрошенного шага.
+    Элементы имеют тот же вид, что и прежний список шагов:
+    {'current', 'distances', 'visited', 'updated_edges'}.
+    """
+
+    def __init__(self, initial_distances: dict, checkpoint_interval: Optional[int] = None):
+        # По умолчанию контрольная точка раз в √V шагов: переход к любому шагу проигрывает
+        # не больше √V шагов журнала, а точки занимают O(V√V) памяти
+        if checkpoint_interval is not None and checkpoint_interval <= 0:
+            raise GraphError("Интервал контрольных точек должен быть положительным.")
+        self.checkpoint_interval = checkpoint_interval or max(1, math.isqrt(len(initial_distances)))
+        self._currents: List[str] = []
+        self._changes: List[List[Tuple[str, float, float]]] = []
+        # Контрольные точки: номер шага -> расстояния после него; -1 — начальное состояние
+        self._checkpoints: Dict[int, dict] = {-1: dict(initial_distances)}
+        self._cursor = -1
+        self._distances = dict(initial_distances)
+        self._visited = set()
+
+    def record(self, current: str, changes: List[Tuple[str, float, float]]):
+        self._currents.append(current)
+        self._changes.append(changes)
+        index = len(self._currents) - 1
+        if (index + 1) % self.checkpoint_interval == 0:
+            self._seek(index)
+            self._checkpoints[index] = dict(self._distances)
+
+    def __len__(self):
+        return len(self._currents)
+
+    def __getitem__(self, index: int) -> dict:
+        if index < 0:
+            index += len(self._currents)
+        if not 0 <= index < len(self._currents):
+            raise IndexError("Номер шага вне диапазона.")
+        self._seek(index)
+        return {
+            'current': self._currents[index],
+            'distances': dict(self._distances),
+            'visited': set(self._visited),
+            'updated_edges': {(self._currents[index], v) for v, _, _ in self._changes[index]},
+        }
+
+    def __iter__(self):
+        for index in range(len(self._currents)):
+            yield self[index]
+
+    def _seek(self, index: int):
+        base = index - (index + 1) % self.checkpoint_interval
+        if base in self._checkpoints and abs(index - self._cursor) > index - base:
+            self._cursor = base
+            self._distances = dict(self._checkpoints[base])
+            self._visited = set(self._currents[:base + 1])
+
+        while self._cursor < index:
+            self._cursor += 1
+            self._visited.add(self._currents[self._cursor])
+            for vertex, _, new in self._changes[self._cursor]:
+                self._distances[vertex] = new
+
+        while self._cursor > index:
+            for vertex, old, _ in reversed(self._changes[self._cursor]):
+                self._distances[vertex] = old
+            self._visited.discard(self._currents[self._cursor])
+            self._cursor -= 1
+
+
+def shortest_path(graph: Graph, source: str, target: str, mode: str = 'dijkstra',
+                  heuristic: Optional[Callable[[str, str], float]] = None) -> Tuple[float, List[str]]:
+    """Кратчайший путь между двумя вершинами.
+
+    Поиск останавливается, как только целевая вершина окончательно обработана.
+    mode: 'dijkstra', 'bidirectional' или 'astar' (требует допустимую и
+    монотонную эвристику heuristic(вершина, цель)).
+    Возвращает (расстояние, путь); для недостижимой цели — (inf, []).
+    """
+    if not graph.weighted:
+        raise GraphError("Алгоритм Дейкстры применим только к взвешенным графам.")
+
+    if graph.has_negative_weights():
+        raise GraphError("Алгоритм Дейкстры не работает с отрицательными весами рёбер.")
+
+    for vertex in (source, target):
+        if vertex not in graph.adjacency_list:
+            raise GraphError(f"Вершина '{vertex}' не найдена в графе.")
+
+    if source == target:
+        return 0, [source]
+
+    if mode == 'dijkstra':
+        return _astar(graph, source, target, lambda v, t: 0)
+    if mode == 'astar':
+        if heuristic is None:
+            raise GraphError("Для режима A* необходимо задать эвристику.")
+        return _astar(graph, source, target, heuristic)
+    if mode == 'bidirectional':
+        return _bidirectional(graph, source, target)
+    raise GraphError(f"Неизвестный режим поиска пути: '{mode}'.")
+
+
+def _astar(graph: Graph, source: str, target: str,
+           heuristic: Callable[[str, str], float]) -> Tuple[float, List[str]]:
+    distances = {source: 0}
+    predecessors: Dict[str, Optional[str]] = {source: None}
+    visited = set()
+    priority_queue = [(heuristic(source, target), 0, source)]
+
+    while priority_queue:
+        _, current_distance, current_vertex = heapq.heappop(priority_queue)
+
+        if current_vertex in visited:
+            continue
+        if current_vertex == target:
+            return current_distance, _unwind(predecessors, target)
+        visited.add(current_vertex)
+
+        for neighbor, weight in graph.adjacency_list[current_vertex]:
+            if weight is None:
+                continue
+            new_distance = current_distance + weight
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                predecessors[neighbor] = current_vertex
+                heapq.heappush(priority_queue, (new_distance + heuristic(neighbor, target), new_distance, neighbor))
+
+    return float('inf'), []
+
+
+def _bidirectional(graph: Graph, source: str, target: str) -> Tuple[float, List[str]]:
+    adjacency = (graph.adjacency_list, graph.reverse_adjacency())
+    distances = ({source: 0}, {target: 0})
+    predecessors = ({source: None}, {target: None})
+    visited = (set(), set())
+    queues = ([(0, source)], [(0, target)])
+    best, meeting = float('inf'), None
+
+    while queues[0] and queues[1]:
+        # Ни один ещё не найденный путь не может быть короче суммы минимумов двух очередей
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+
+        side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+        current_distance, current_vertex = heapq.heappop(queues[side])
+        if current_vertex in visited[side]:
+            continue
+        visited[side].add(current_vertex)
+
+        dist, other = distances[side], distances[1 - side]
+        for neighbor, weight in adjacency[side][current_vertex]:
+            if weight is None:
+                continue
+            new_distance = current_distance + weight
+            if new_distance < dist.get(neighbor, float('inf')):
+                dist[neighbor] = new_distance
+                predecessors[side][neighbor] = current_vertex
+                heapq.heappush(queues[side], (new_distance, neighbor))
+            if neighbor in other and dist[neighbor] + other[neighbor] < best:
+                best, meeting = dist[neighbor] + other[neighbor], neighbor
+
+    if meeting is None:
+        return float('inf'), []
+    forward = _unwind(predecessors[0], meeting)
+    backward = _unwind(predecessors[1], meeting)
+    return best, forward + backward[-2::-1]
+
+
+def _unwind(predecessors: Dict[str, Optional[str]], vertex: str) -> List[str]:
+    path = []
+    while vertex is not None:
+        path.append(vertex)
+        vertex = predecessors[vertex]
+    path.reverse()
+    return path
+
+
+def _record_stats(stats: AlgorithmStats, start: str, settled: int, pushes: int, scanned: int, seconds: float):
+    # Очередь опустошается полностью, поэтому извлечений столько же, сколько вставок
+    # (включая источник); лишние извлечения — устаревшие записи
+    stats.record('dijkstra', {
+        'settled': settled,
+        'heap_pushes': pushes + 1,
+        'heap_pops': pushes + 1,
+        'stale_pops': pushes + 1 - settled,
+        'edges_scanned': scanned,
+        'distance_updates': pushes,
+    }, {'search': seconds}, start)
+
+
+def _dijkstra_compact(graph: CompactGraph, start: str, stats: Optional[AlgorithmStats] = None,
+                      queue: str = 'heap', with_predecessors: bool = False):
+    if not graph.weighted:
+        raise GraphError("Алгоритм Дейкстры применим только к взвешенным графам.")
+
+    if graph.has_negative_weights():
+        raise GraphError("Алгоритм Дейкстры не работает с отрицательными весами рёбер.")
+
+    if start not in graph.index:
+        raise GraphError(f"Начальная вершина '{start}' не найдена в графе.")
+
+    args = (graph.offsets, graph.targets, graph.weights, graph.index[start], stats, start)
+    parents = array('i', [-1]) * graph.vertex_count if with_predecessors else None
+    if queue == 'indexed':
+        distances = _dijkstra_ids_indexed(*args, parents=parents)
+    elif queue == 'dial':
+        max_weight = graph.max_integer_weight()
+        if max_weight is None or max_weight > DIAL_MAX_WEIGHT:
+            raise GraphError(f"Очередь Дайала требует целых весов от 0 до {DIAL_MAX_WEIGHT}.")
+        distances = _dijkstra_ids_dial(*args, max_weight, parents=parents)
+    else:
+        distances = _dijkstra_ids(*args, parents=parents)
+    if with_predecessors:
+        return dict(zip(graph.vertices, distances)), ShortestPathTree(graph.vertices, graph.index, start, parents)
+    return dict(zip(graph.vertices, distances))
+
+
+def _dijkstra_ids(offsets, targets, weights, source: int,
+                  stats: Optional[AlgorithmStats] = None, source_name: Optional[str] = None,
+                  parents: Optional[array] = None) -> list:
+    # Дейкстра по CSR-массивам; вершины — целые номера, результат — список расстояний.
+    # parents, если передан, заполняется номерами предков (проверка только при улучшении расстояния)
+    push = heapq.heappush
+    if stats is not None:
+        started = time.perf_counter()
+        push = CallCounter(push)
+    n = len(offsets) - 1
+    distances = [float('inf')] * n
+    distances[source] = 0
+    visited = bytearray(n)
+
+    priority_queue = [(0, source)]
+
+    while priority_queue:
+        current_distance, u = heapq.heappop(priority_queue)
+
+        if visited[u]:
+            continue
+        visited[u] = 1
+
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            new_distance = current_distance + weights[e]
+            if new_distance < distances[v]:
+                distances[v] = new_distance
+                if parents is not None:
+                    parents[v] = u
+                push(priority_queue, (new_distance, v))
+
+    if stats is not None:
+        settled = [u for u in range(n) if visited[u]]
+        scanned = sum(offsets[u + 1] - offsets[u] for u in settled)
+        _record_stats(stats, source_name, len(settled), push.calls, scanned, time.perf_counter() - started)
+    return distances
+
+
+def _dijkstra_ids_indexed(offsets, targets, weights, source: int,
+                          stats: Optional[AlgorithmStats] = None, source_name: Optional[str] = None,
+                          parents: Optional[array] = None) -> list:
+    # Каждая вершина в куче не больше одного раза: извлечённая вершина сразу окончательна
+    n = len(offsets) - 1
+    distances = [float('inf')] * n
+    distances[source] = 0
+    heap = IndexedHeap(n)
+    push, pop, items = heap.push, heap.pop, heap.heap
+    if stats is not None:
+        started = time.perf_counter()
+        push = CallCounter(push)
+    push(source, 0)
+
+    while items:
+        current_distance, u = pop()
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            new_distance = current_distance + weights[e]
+            if new_distance < distances[v]:
+                distances[v] = new_distance
+                if parents is not None:
+                    parents[v] = u
+                push(v, new_distance)
+
+    if stats is not None:
+        # Куча опустошается, поэтому извлечены все достигнутые вершины. Вставок столько же,
+        # сколько извлечений; остальные обновления — уменьшения ключа
+        reached = [u for u in range(n) if distances[u] != float('inf')]
+        scanned = sum(offsets[u + 1] - offsets[u] for u in reached)
+        settled = len(reached)
+        stats.record('dijkstra', {
+            'settled': settled,
+            'heap_pushes': settled,
+            'heap_pops': settled,
+            'decrease_keys': push.calls - settled,
+            'edges_scanned': scanned,
+            'distance_updates': push.calls - 1,
+        }, {'search': time.perf_counter() - started}, source_name)
     return distances
 
 
+def _dijkstra_ids_dial(offsets, targets, weights, source: int,
+                       stats: Optional[AlgorithmStats] = None, source_name: Optional[str] = None,
+                       max_weight: int = 0, parents: Optional[array] = None) -> list:
+    n = len(offsets) - 1
+    distances = [float('inf')] * n
+    distances[source] = 0
+    visited = bytearray(n)
+    queue = BucketQueue(max_weight)
+    push, pop = queue.push, queue.pop
+    if stats is not None:
+        started = time.perf_counter()
+        push = CallCounter(push)
+    push(source, 0)
+
+    while queue.count:
+        current_distance, u = pop()
+        if visited[u]:
+            continue
+        visited[u] = 1
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            new_distance = current_distance + weights[e]
+            if new_distance < distances[v]:
+                distances[v] = new_distance
+                if parents is not None:
+                    parents[v] = u
+                push(v, int(new_distance))
+
+    if stats is not None:
+        pushes = push.calls - 1
+        settled = [u for u in range(n) if visited[u]]
+        scanned = sum(offsets[u + 1] - offsets[u] for u in settled)
+        stats.record('dijkstra', {
+            'settled': len(settled),
+            'bucket_pushes': pushes + 1,
+            'bucket_pops': pushes + 1,
+            'stale_pops': pushes + 1 - len(settled),
+            'buckets': max_weight + 1,
+            'edges_scanned': scanned,
+            'distance_updates': pushes,
+        }, {'search': time.perf_counter() - started}, source_name)
+    return distances
@@ -0,0 +1,222 @@
+import heapq
+from typing import Dict, List, Optional
+
+from graph import Graph, GraphError
+
+
+class DynamicShortestPaths:
+    """Дерево кратчайших путей от одного источника, поддерживаемое при изменениях графа.
+
+    Рёбра добавляются и удаляются через insert_edge/delete_edge: граф
+    изменяется, а расстояния пересчитываются только в затронутой части
+    дерева. Уменьшение веса ребра — это добавление параллельного ребра
+    с меньшим весом. Если граф изменили в обход этих методов (graph.version
+    не совпадает), при следующем обращении дерево строится заново.
+    """
+
+    def __init__(self, graph: Graph, source: str):
+        if not graph.weighted:
+            raise GraphError("Алгоритм Дейкстры применим только к взвешенным графам.")
+        if source not in graph.adjacency_list:
+            raise GraphError(f"Начальная вершина '{source}' не найдена в графе.")
+        self.graph = graph
+        self.source = source
+        self.recompute()
+
+    def recompute(self):
+        graph = self.graph
+        if graph.has_negative_weights():
+            raise GraphError("Алгоритм Дейкстры не работает с отрицательными весами рёбер.")
+        self.distances: Dict[str, float] = {vertex: float('inf') for vertex in graph.adjacency_list}
+        self.parents: Dict[str, Optional[str]] = {vertex: None for vertex in graph.adjacency_list}
+        self._children: Dict[str, set] = {}
+        self.distances[self.source] = 0
+        self._propagate([(0, self.source)])
+        self._version = graph.version
+
+    def _sync(self):
+        if self._version != self.graph.version:
+            self.recompute()
+
+    def distance(self, vertex: str) -> float:
+        self._sync()
+        if vertex not in self.distances:
+            raise GraphError(f"Вершина '{vertex}' не найдена в графе.")
+        return self.distances[vertex]
+
+    def path(self, vertex: str) -> List[str]:
+        # Путь от источника до vertex по дереву; пустой список, если вершина недостижима
+        if self.distance(vertex) == float('inf'):
+            return []
+        path = []
+        while vertex is not None:
+            path.append(vertex)
+            vertex = self.parents[vertex]
+        path.reverse()
+        return path
+
+    def insert_edge(self, u: str, v: str, weight: float):
+        self._sync()
+        if weight is None or weight < 0:
+            raise GraphError("Алгоритм Дейкстры не работает с отрицательными весами рёбер.")
+        self.graph.add_edge(u, v, weight)
+        self._version = self.graph.version
+        for vertex in (u, v):
+            if vertex not in self.distances:
+                self.distances[vertex] = float('inf')
+                self.parents[vertex] = None
+
+        queue = []
+        ends = ((u, v),) if self.graph.directed else ((u, v), (v, u))
+        for a, b in ends:
+            candidate = self.distances[a] + weight
+            if candidate < self.distances[b]:
+                self.distances[b] = candidate
+                self._set_parent(b, a)
+                queue.append((candidate, b))
+        heapq.heapify(queue)
+        self._propagate(queue)
+
+    def delete_edge(self, u: str, v: str):
+        # Удаляются все рёбра u -> v (как в Graph.remove_edge)
+        self._sync()
+        self.graph.remove_edge(u, v)
+        self._version = self.graph.version
+
+        ends = ((u, v),) if self.graph.directed else ((u, v), (v, u))
+        for a, b in ends:
+            if self.parents.get(b) == a:
+                self._repair(b)
+
+    def _repair(self, root: str):
+        # Поддерево root теряет путь по дереву: сбрасываем его расстояния и ищем
+        # лучший вход извне поддерева, затем Дейкстра только по затронутым вершинам
+        affected = self._subtree(root)
+        inf = float('inf')
+        for x in affected:
+            self.distances[x] = inf
+            self._set_parent(x, None)
+
+        adjacency = self.graph.adjacency_list
+        in_index = self.graph._neighbour_index()[1]
+        queue = []
+        for x in affected:
+            best, best_parent = inf, None
+            for p in in_index[x]:
+                if p in affected or self.distances[p] == inf:
+                    continue
+                weight = min(w for y, w in adjacency[p] if y == x)
+                if self.distances[p] + weight < best:
+                    best, best_parent = self.distances[p] + weight, p
+            if best_parent is not None:
+                self.distances[x] = best
+                self._set_parent(x, best_parent)
+                queue.append((best, x))
+        heapq.heapify(queue)
+        self._propagate(queue)
+
+    def _propagate(self, queue):
+        distances, adjacency = self.distances, self.graph.adjacency_list
+        while queue:
+            d, x = heapq.heappop(queue)
+            if d > distances[x]:
+                continue
+            for y, weight in adjacency[x]:
+                candidate = d + weight
+                if candidate < distances[y]:
+                    distances[y] = candidate
+                    self._set_parent(y, x)
+                    heapq.heappush(queue, (candidate, y))
+
+    def _set_parent(self, vertex: str, parent: Optional[str]):
+        old = self.parents.get(vertex)
+        if old is not None:
+            self._children[old].discard(vertex)
+        self.parents[vertex] = parent
+        if parent is not None:
+            self._children.setdefault(parent, set()).add(vertex)
+
+    def _subtree(self, root: str) -> set:
+        result = {root}
+        stack = [root]
+        while stack:
+            for child in self._children.get(stack.pop(), ()):
+                if child not in result:
+                    result.add(child)
+                    stack.append(child)
+        return result
+
+
+class DynamicAllPairs:
+    """Матрица кратчайших расстояний между всеми парами, поддерживаемая при изменениях графа.
+
+    Добавление ребра (и уменьшение веса) обновляет матрицу за O(V^2).
+    Удаление ребра, которое лежит на каком-либо кратчайшем пути, требует
+    полного пересчёта; удаление остальных рёбер матрицу не меняет.
+    """
+
+    def __init__(self, graph: Graph, workers: Optional[int] = 1):
+        if not graph.weighted:
+            raise GraphError("Поиск кратчайших путей между всеми парами применим только к взвешенным графам.")
+        self.graph = graph
+        self.workers = workers
+        self.recompute()
+
+    def recompute(self):
+        from algorithms.all_pairs import all_pairs_shortest_paths
+        self.dist: Dict[str, Dict[str, float]] = dict(all_pairs_shortest_paths(self.graph, workers=self.workers))
+        self._version = self.graph.version
+
+    def _sync(self):
+        if self._version != self.graph.version:
+            self.recompute()
+
+    def distance(self, u: str, v: str) -> float:
+        self._sync()
+        if u not in self.dist or v not in self.dist:
+            raise GraphError("Одна или обе вершины не найдены в графе.")
+        return self.dist[u][v]
+
+    def insert_edge(self, u: str, v: str, weight: float):
+        self._sync()
+        if weight is None:
+            raise GraphError("Weighted graph requires weight for edge.")
+        inf = float('inf')
+        back = self.dist[v][u] if v in self.dist and u in self.dist else (0 if u == v else inf)
+        if back + weight < 0 or not self.graph.directed and weight < 0:
+            raise GraphError("Добавление ребра создаёт цикл отрицательного веса.")
+
+        self.graph.add_edge(u, v, weight)
+        self._version = self.graph.version
+        for vertex in (u, v):
+            if vertex not in self.dist:
+                for row in self.dist.values():
+                    row[vertex] = inf
+                self.dist[vertex] = dict.fromkeys(self.dist, inf)
+                self.dist[vertex][vertex] = 0
+
+        self._relax_through(u, v, weight)
+        if not self.graph.directed:
+            self._relax_through(v, u, weight)
+
+    def _relax_through(self, u: str, v: str, weight: float):
+        # d(i, j) = min(d(i, j), d(i, u) + w + d(v, j)); меняются только строки, где улучшается d(i, v)
+        row_v = self.dist[v]
+        for row in self.dist.values():
+            base = row[u] + weight
+            if base >= row[v]:
+                continue
+            for j, d_vj in row_v.items():
+                if base + d_vj < row[j]:
+                    row[j] = base + d_vj
+
+    def delete_edge(self, u: str, v: str):
+        self._sync()
+        if u not in self.graph.adjacency_list or v not in self.graph.adjacency_list:
+            raise GraphError("One or both vertices do not exist.")
+        weights = [w for y, w in self.graph.adjacency_list[u] if y == v]
+        self.graph.remove_edge(u, v)
+        self._version = self.graph.version
+        # Ребро тяжелее кратчайшего расстояния u -> v не лежит ни на одном кратчайшем пути
+        if weights and min(weights) <= self.dist[u][v]:
+            self.recompute()
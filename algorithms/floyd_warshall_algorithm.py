@@ -1,9 +1,49 @@
+import time
+from array import array
+from typing import List, Optional, Tuple, Union
 from graph import Graph, GraphError
+from compact_graph import CompactGraph
+from algorithms.result_cache import cached
+from algorithms.stats import AlgorithmStats
+from algorithms.paths import NextHopMatrix
+
+# Размер матрицы, начиная с которого матричный движок переходит на блочный режим
+BLOCKED_THRESHOLD = 1024
+DEFAULT_BLOCK_SIZE = 256
+
+def floyd_warshall(graph: Union[Graph, CompactGraph], engine: str = 'python',
+                   block_size: Optional[int] = None, float32: bool = False,
+                   use_cache: bool = False, stats: Optional[AlgorithmStats] = None,
+                   with_predecessors: bool = False):
+    # with_predecessors=True возвращает пару (расстояния, NextHopMatrix)
+    if use_cache and not with_predecessors:
+        # Движки дают одинаковые расстояния; отличается только точность float32
+        return cached(graph, ('floyd_warshall', engine == 'numpy' and float32),
+                      lambda: floyd_warshall(graph, engine, block_size, float32, stats=stats), stats)
+
+    if engine == 'numpy':
+        matrix = floyd_warshall_matrix(graph, block_size=block_size, float32=float32, stats=stats,
+                                       with_predecessors=with_predecessors)
+        vertices, dist = matrix[:2]
+        if stats is not None:
+            started = time.perf_counter()
+        result = {u: dict(zip(vertices, row)) for u, row in zip(vertices, dist.tolist())}
+        if stats is not None:
+            stats.record('floyd_warshall', {}, {'convert': time.perf_counter() - started})
+        if with_predecessors:
+            return result, matrix[2]
+        return result
+    if engine != 'python':
+        raise GraphError(f"Неизвестный движок алгоритма Флойда-Уоршелла: '{engine}'.")
+
+    if isinstance(graph, CompactGraph):
+        return _floyd_warshall_compact(graph, stats, with_predecessors)
 
-def floyd_warshall(graph: Graph) -> dict:
     if not graph.weighted:
         raise GraphError("Алгоритм Флойда-Уоршелла применим только к взвешенным графам.")
 
+    if stats is not None:
+        started = time.perf_counter()
     vertices = list(graph.adjacency_list.keys())
     dist = {u: {v: float('inf') for v in vertices} for u in vertices}
 
@@ -14,17 +54,241 @@ def floyd_warshall(graph: Graph) -> dict:
         for v, w in graph.adjacency_list[u]:
             if w is None:
                 continue
-            dist[u][v] = w
+            if w < dist[u][v]:
+                dist[u][v] = w
+
+    index = next_hop = None
+    if with_predecessors:
+        index = {v: i for i, v in enumerate(vertices)}
+        next_hop = _initial_next_hop(len(vertices), ((index[u], index[v]) for u in vertices
+                                                     for v, w in graph.adjacency_list[u] if w is not None))
 
-    for k in vertices:
-        for i in vertices:
-            for j in vertices:
-                if dist[i][k] + dist[k][j] < dist[i][j]:
-                    dist[i][j] = dist[i][k] + dist[k][j]
+    if stats is not None:
+        initialized = time.perf_counter()
+    if next_hop is None:
+        for k in vertices:
+            for i in vertices:
+                for j in vertices:
+                    if dist[i][k] + dist[k][j] < dist[i][j]:
+                        dist[i][j] = dist[i][k] + dist[k][j]
+    else:
+        # Отдельный цикл, чтобы расчёт без путей не проверял next_hop на каждой ячейке
+        for k_id, k in enumerate(vertices):
+            row_k = dist[k]
+            for i_id, i in enumerate(vertices):
+                row_i, d_ik = dist[i], dist[i][k]
+                hops_i = next_hop[i_id]
+                hop = hops_i[k_id]
+                for j_id, j in enumerate(vertices):
+                    if d_ik + row_k[j] < row_i[j]:
+                        row_i[j] = d_ik + row_k[j]
+                        hops_i[j_id] = hop
 
+    if stats is not None:
+        relaxed = time.perf_counter()
     # Проверка наличия отрицательных циклов
     for v in vertices:
         if dist[v][v] < 0:
             raise GraphError("Обнаружен цикл отрицательного веса. Алгоритм Флойда-Уоршелла не может быть применён.")
 
+    if stats is not None:
+        n = len(vertices)
+        _record_stats(stats, {'vertices': n, 'cell_checks': n ** 3}, started, initialized, relaxed)
+    if with_predecessors:
+        return dist, NextHopMatrix(vertices, index, next_hop)
     return dist
+
+
+def _initial_next_hop(n: int, edges) -> List[array]:
+    # До релаксации следующая вершина пути i -> j — сама j, если есть ребро, и i на диагонали
+    next_hop = [array('i', [-1]) * n for _ in range(n)]
+    for u, v in edges:
+        next_hop[u][v] = v
+    for v in range(n):
+        next_hop[v][v] = v
+    return next_hop
+
+
+def _record_stats(stats: AlgorithmStats, counters: dict, started: float, initialized: float, relaxed: float):
+    stats.record('floyd_warshall', counters, {
+        'init': initialized - started,
+        'relaxation': relaxed - initialized,
+        'negative_cycle_check': time.perf_counter() - relaxed,
+    })
+
+
+def _floyd_warshall_compact(graph: CompactGraph, stats: Optional[AlgorithmStats] = None,
+                            with_predecessors: bool = False):
+    if not graph.weighted:
+        raise GraphError("Алгоритм Флойда-Уоршелла применим только к взвешенным графам.")
+
+    if stats is not None:
+        started = time.perf_counter()
+    n = graph.vertex_count
+    inf = float('inf')
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    dist = [[inf] * n for _ in range(n)]
+
+    for u in range(n):
+        dist[u][u] = 0
+        row = dist[u]
+        for e in range(offsets[u], offsets[u + 1]):
+            if weights[e] < row[targets[e]]:
+                row[targets[e]] = weights[e]
+
+    next_hop = None
+    if with_predecessors:
+        next_hop = _initial_next_hop(n, ((u, targets[e]) for u in range(n) for e in range(offsets[u], offsets[u + 1])))
+
+    if stats is not None:
+        initialized = time.perf_counter()
+    skipped = 0
+    for k in range(n):
+        row_k = dist[k]
+        if stats is not None:
+            # Столбец k на шаге k не меняется, поэтому пропуски строк считаются заранее
+            skipped += sum(1 for row in dist if row[k] == inf)
+        for i in range(n):
+            d_ik = dist[i][k]
+            if d_ik == inf:
+                continue
+            if next_hop is None:
+                dist[i] = [d_ij if d_ij <= d_ik + d_kj else d_ik + d_kj
+                           for d_ij, d_kj in zip(dist[i], row_k)]
+                continue
+            row_i, hops_i = dist[i], next_hop[i]
+            hop = hops_i[k]
+            for j in range(n):
+                if d_ik + row_k[j] < row_i[j]:
+                    row_i[j] = d_ik + row_k[j]
+                    hops_i[j] = hop
+
+    if stats is not None:
+        relaxed = time.perf_counter()
+    # Проверка наличия отрицательных циклов
+    for v in range(n):
+        if dist[v][v] < 0:
+            raise GraphError("Обнаружен цикл отрицательного веса. Алгоритм Флойда-Уоршелла не может быть применён.")
+
+    if stats is not None:
+        # Строка i пропускается на шаге k, если из i в k пути пока нет
+        _record_stats(stats, {'vertices': n, 'row_relaxations': n * n - skipped, 'rows_skipped': skipped},
+                      started, initialized, relaxed)
+
+    vertices = graph.vertices
+    result = {vertices[i]: dict(zip(vertices, dist[i])) for i in range(n)}
+    if with_predecessors:
+        return result, NextHopMatrix(vertices, graph.index, next_hop)
+    return result
+
+
+def floyd_warshall_matrix(graph: Union[Graph, CompactGraph], block_size: Optional[int] = None,
+                          float32: bool = False, stats: Optional[AlgorithmStats] = None,
+                          with_predecessors: bool = False) -> Tuple[List[str], 'np.ndarray']:
+    """Матричный Флойд-Уоршелл на NumPy.
+
+    Возвращает список вершин и квадратную матрицу расстояний в том же порядке.
+    block_size задаёт размер блока для кэш-дружественного режима; по умолчанию
+    блочный режим включается для матриц больше BLOCKED_THRESHOLD.
+    При with_predecessors=True третьим элементом возвращается NextHopMatrix
+    (матрица int32); блочный режим тогда не используется.
+    """
+    np = _require_numpy()
+
+    if stats is not None:
+        started = time.perf_counter()
+    if isinstance(graph, Graph):
+        graph = graph.freeze()
+    if not graph.weighted:
+        raise GraphError("Алгоритм Флойда-Уоршелла применим только к взвешенным графам.")
+
+    n = graph.vertex_count
+    dtype = np.float32 if float32 else np.float64
+    dist = np.full((n, n), np.inf, dtype=dtype)
+    np.fill_diagonal(dist, 0)
+
+    offsets = np.frombuffer(graph.offsets, dtype=np.int64)
+    sources = np.repeat(np.arange(n), np.diff(offsets))
+    targets = np.frombuffer(graph.targets, dtype=np.int32)
+    weights = np.frombuffer(graph.weights, dtype=np.float64).astype(dtype)
+    np.minimum.at(dist, (sources, targets), weights)
+
+    if block_size is None:
+        block_size = DEFAULT_BLOCK_SIZE if n > BLOCKED_THRESHOLD else max(n, 1)
+    if block_size <= 0:
+        raise GraphError("Размер блока должен быть положительным.")
+
+    next_hop = None
+    if with_predecessors:
+        next_hop = np.full((n, n), -1, dtype=np.int32)
+        next_hop[sources, targets] = targets
+        np.fill_diagonal(next_hop, np.arange(n, dtype=np.int32))
+
+    if stats is not None:
+        initialized = time.perf_counter()
+    if next_hop is not None:
+        for k in range(n):
+            candidate = dist[:, k, None] + dist[None, k, :]
+            improved = candidate < dist
+            np.copyto(next_hop, next_hop[:, k, None].copy(), where=improved)
+            np.minimum(dist, candidate, out=dist)
+    elif block_size >= n:
+        for k in range(n):
+            np.minimum(dist, dist[:, k, None] + dist[None, k, :], out=dist)
+    else:
+        _blocked_relax(np, dist, block_size)
+
+    if stats is not None:
+        relaxed = time.perf_counter()
+    # Проверка наличия отрицательных циклов
+    if n and dist.diagonal().min() < 0:
+        raise GraphError("Обнаружен цикл отрицательного веса. Алгоритм Флойда-Уоршелла не может быть применён.")
+
+    if stats is not None:
+        blocks = -(-n // block_size)
+        _record_stats(stats, {'vertices': n, 'block_size': min(block_size, n), 'blocks': blocks * blocks,
+                              'matrix_bytes': dist.nbytes}, started, initialized, relaxed)
+
+    if next_hop is not None:
+        return list(graph.vertices), dist, NextHopMatrix(graph.vertices, graph.index, next_hop)
+    return list(graph.vertices), dist
+
+
+def _blocked_relax(np, dist, block: int):
+    n = dist.shape[0]
+    bounds = [(lo, min(lo + block, n)) for lo in range(0, n, block)]
+
+    for kb, (k0, k1) in enumerate(bounds):
+        # Фаза 1: диагональный блок
+        diag = dist[k0:k1, k0:k1]
+        for k in range(k1 - k0):
+            np.minimum(diag, diag[:, k, None] + diag[None, k, :], out=diag)
+
+        # Фаза 2: строка и столбец блоков, проходящие через диагональный блок
+        row = dist[k0:k1, :]
+        col = dist[:, k0:k1]
+        for k in range(k1 - k0):
+            np.minimum(row, row[:, k0 + k, None] + row[None, k, :], out=row)
+        for k in range(k1 - k0):
+            np.minimum(col, col[:, k, None] + col[None, k0 + k, :], out=col)
+
+        # Фаза 3: остальные блоки, каждый обрабатывается целиком, пока он в кэше
+        for ib, (i0, i1) in enumerate(bounds):
+            if ib == kb:
+                continue
+            col_block = dist[i0:i1, k0:k1]
+            for jb, (j0, j1) in enumerate(bounds):
+                if jb == kb:
+                    continue
+                tile = dist[i0:i1, j0:j1]
+                row_block = dist[k0:k1, j0:j1]
+                for k in range(k1 - k0):
+                    np.minimum(tile, col_block[:, k, None] + row_block[None, k, :], out=tile)
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise GraphError("Для матричного движка алгоритма Флойда-Уоршелла требуется пакет numpy.") from None
+    return numpy
@@ -0,0 +1,61 @@
+from array import array
+from typing import List, Tuple, Union
+
+from graph import Graph, GraphError
+from compact_graph import CompactGraph
+from algorithms.bellman_ford_algorithm import bellman_ford
+from algorithms.dijkstra_algorithm import _dijkstra_ids
+
+
+def johnson(graph: Union[Graph, CompactGraph]) -> dict:
+    if isinstance(graph, Graph):
+        graph = graph.freeze()
+    if not graph.weighted:
+        raise GraphError("Алгоритм Джонсона применим только к взвешенным графам.")
+
+    reweighted, potentials = _reweight(graph)
+    vertices = graph.vertices
+    return {vertices[s]: _restore_row(reweighted, potentials, s) for s in range(graph.vertex_count)}
+
+
+def _reweight(graph: CompactGraph) -> Tuple[CompactGraph, List[float]]:
+    # Потенциалы h(v) — расстояния от виртуальной вершины, соединённой со всеми рёбрами веса 0
+    n = graph.vertex_count
+    virtual = "__johnson_source__"
+    while virtual in graph.index:
+        virtual = "_" + virtual
+
+    offsets = array('q', graph.offsets)
+    offsets.append(graph.edge_count + n)
+    targets = array('i', graph.targets)
+    targets.extend(range(n))
+    weights = array('d', graph.weights)
+    weights.extend([0.0] * n)
+    extended = CompactGraph(graph.vertices + [virtual], offsets, targets, weights,
+                            directed=True, weighted=True)
+
+    try:
+        distances = bellman_ford(extended, virtual)
+    except GraphError:
+        raise GraphError("Обнаружен цикл отрицательного веса. Алгоритм Джонсона не может быть применён.") from None
+    potentials = [distances[v] for v in graph.vertices]
+
+    new_weights = array('d', bytes(8 * graph.edge_count))
+    offs, tgts, ws = graph.offsets, graph.targets, graph.weights
+    for u in range(n):
+        hu = potentials[u]
+        for e in range(offs[u], offs[u + 1]):
+            # w + h(u) - h(v) >= 0; max отсекает отрицательный ноль из-за погрешности округления
+            new_weights[e] = max(0.0, ws[e] + hu - potentials[tgts[e]])
+
+    reweighted = CompactGraph(graph.vertices, graph.offsets, graph.targets, new_weights,
+                              directed=graph.directed, weighted=True)
+    reweighted._has_negative_weights = False
+    return reweighted, potentials
+
+
+def _restore_row(reweighted: CompactGraph, potentials: List[float], source: int, row=None) -> dict:
+    if row is None:
+        row = _dijkstra_ids(reweighted.offsets, reweighted.targets, reweighted.weights, source)
+    hs = potentials[source]
+    return {v: d - hs + hv for v, d, hv in zip(reweighted.vertices, row, potentials)}
@@ -0,0 +1,103 @@
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from graph import GraphError
+
+# Цикл в предках возможен только из-за округления: цикл нулевого веса в дробных весах
+# может посчитаться чуть отрицательным и не быть замеченным проверкой алгоритма
+_CYCLE_MESSAGE = "Путь не восстанавливается: предыдущие вершины образуют цикл (ошибка округления весов)."
+
+
+class ShortestPathTree:
+    """Дерево кратчайших путей от одного источника.
+
+    parents[v] — номер предыдущей вершины на кратчайшем пути к v
+    (-1 у источника и недостижимых вершин), хранится массивом array('i').
+    Путь до вершины восстанавливается за O(длины пути).
+    """
+
+    def __init__(self, vertices: Sequence[str], index: Dict[str, int], source: str, parents: array):
+        self.vertices = vertices
+        self.index = index
+        self.source = source
+        self.parents = parents
+
+    @classmethod
+    def from_dict(cls, parents: Dict[str, Optional[str]], source: str) -> 'ShortestPathTree':
+        # Из словаря {вершина: предыдущая вершина или None}; порядок вершин — порядок словаря
+        vertices = list(parents)
+        index = {v: i for i, v in enumerate(vertices)}
+        return cls(vertices, index, source,
+                   array('i', (-1 if p is None else index[p] for p in parents.values())))
+
+    def _id(self, vertex: str) -> int:
+        try:
+            return self.index[vertex]
+        except KeyError:
+            raise GraphError(f"Вершина '{vertex}' не найдена в графе.") from None
+
+    def reachable(self, vertex: str) -> bool:
+        return vertex == self.source or self.parents[self._id(vertex)] >= 0
+
+    def parent(self, vertex: str) -> Optional[str]:
+        p = self.parents[self._id(vertex)]
+        return self.vertices[p] if p >= 0 else None
+
+    def path(self, target: str) -> List[str]:
+        """Вершины пути от источника до target; пустой список, если target недостижима."""
+        v = self._id(target)
+        parents, vertices = self.parents, self.vertices
+        if target != self.source and parents[v] < 0:
+            return []
+        path = []
+        while v >= 0:
+            path.append(vertices[v])
+            v = parents[v]
+            if len(path) > len(vertices):
+                raise GraphError(_CYCLE_MESSAGE)
+        path.reverse()
+        return path
+
+    def paths(self, targets: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """Пути до нескольких вершин (по умолчанию до всех достижимых)."""
+        if targets is None:
+            targets = [v for v, p in zip(self.vertices, self.parents) if p >= 0 or v == self.source]
+        return {target: self.path(target) for target in targets}
+
+
+class NextHopMatrix:
+    """Матрица следующих вершин для путей между всеми парами.
+
+    next_hop[i][j] — номер вершины, следующей за i на кратчайшем пути из i в j
+    (-1, если пути нет; next_hop[i][i] == i). Строки — array('i') или строки
+    матрицы numpy. Путь восстанавливается за O(длины пути).
+    """
+
+    def __init__(self, vertices: Sequence[str], index: Dict[str, int], next_hop):
+        self.vertices = vertices
+        self.index = index
+        self.next_hop = next_hop
+
+    def _id(self, vertex: str) -> int:
+        try:
+            return self.index[vertex]
+        except KeyError:
+            raise GraphError(f"Вершина '{vertex}' не найдена в графе.") from None
+
+    def path(self, source: str, target: str) -> List[str]:
+        """Вершины пути из source в target; пустой список, если пути нет."""
+        i, j = self._id(source), self._id(target)
+        next_hop, vertices = self.next_hop, self.vertices
+        if next_hop[i][j] < 0:
+            return []
+        path = [vertices[i]]
+        while i != j:
+            i = int(next_hop[i][j])
+            path.append(vertices[i])
+            if len(path) > len(vertices):
+                raise GraphError(_CYCLE_MESSAGE)
+        return path
+
+    def paths(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], List[str]]:
+        """Пути для списка пар (источник, цель)."""
+        return {(source, target): self.path(source, target) for source, target in pairs}
+
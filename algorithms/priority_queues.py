@@ -0,0 +1,101 @@
+from typing import List, Tuple
+
+
+class IndexedHeap:
+    """Двоичная куча целых номеров 0..n-1 с настоящим уменьшением ключа.
+
+    Каждая вершина лежит в куче не больше одного раза (позиции хранятся в
+    массиве), поэтому размер кучи не превышает n, а устаревших записей нет.
+    """
+
+    def __init__(self, n: int):
+        self.keys: List[float] = [0.0] * n
+        self.position: List[int] = [-1] * n
+        self.heap: List[int] = []
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item: int) -> bool:
+        return self.position[item] >= 0
+
+    def push(self, item: int, key: float):
+        # Вставка или уменьшение ключа, если элемент уже в куче
+        keys, position, heap = self.keys, self.position, self.heap
+        i = position[item]
+        if i < 0:
+            i = len(heap)
+            heap.append(item)
+        elif key >= keys[item]:
+            return
+        keys[item] = key
+        # Просеивание вверх
+        while i > 0:
+            parent = (i - 1) >> 1
+            above = heap[parent]
+            if keys[above] <= key:
+                break
+            heap[i] = above
+            position[above] = i
+            i = parent
+        heap[i] = item
+        position[item] = i
+
+    def pop(self) -> Tuple[float, int]:
+        keys, position, heap = self.keys, self.position, self.heap
+        top = heap[0]
+        last = heap.pop()
+        position[top] = -1
+        if heap:
+            # Просеивание вниз последнего элемента с корня
+            n = len(heap)
+            key = keys[last]
+            i = 0
+            child = 1
+            while child < n:
+                right = child + 1
+                if right < n and keys[heap[right]] < keys[heap[child]]:
+                    child = right
+                below = heap[child]
+                if key <= keys[below]:
+                    break
+                heap[i] = below
+                position[below] = i
+                i = child
+                child = 2 * i + 1
+            heap[i] = last
+            position[last] = i
+        return keys[top], top
+
+
+class BucketQueue:
+    """Очередь Дайала для целых неотрицательных ключей.
+
+    Ключи хранятся в кольце из max_key + 1 корзин: в любой момент все ключи
+    в очереди лежат в диапазоне [текущий минимум, минимум + max_key], где
+    max_key — наибольший вес ребра. Извлечение возвращает элементы в порядке
+    неубывания ключа; повторные вставки одного элемента не удаляются, их
+    отбрасывает вызывающий код (как в ленивой куче).
+    """
+
+    def __init__(self, max_key: int):
+        self.size = max_key + 1
+        self.buckets: List[List[int]] = [[] for _ in range(self.size)]
+        self.current = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def push(self, item: int, key: int):
+        self.buckets[key % self.size].append(item)
+        self.count += 1
+
+    def pop(self) -> Tuple[int, int]:
+        buckets, size = self.buckets, self.size
+        current = self.current
+        while not buckets[current % size]:
+            current += 1
+        self.current = current
+        self.count -= 1
+        return current, buckets[current % size].pop()
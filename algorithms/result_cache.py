@@ -0,0 +1,101 @@
+import sys
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+# Предел памяти кэша одного графа по умолчанию
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Приблизительный размер float-значения в словаре результата (объект float + слот)
+_VALUE_BYTES = 32
+
+
+class ResultCache:
+    """LRU-кэш результатов алгоритмов для одного графа.
+
+    Записи действительны, пока не изменилась версия графа (graph.version);
+    при первом обращении после изменения кэш очищается целиком.
+    Размер записей оценивается приблизительно, по числу хранимых расстояний.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.version = None
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key: Hashable, version: int):
+        if version != self.version:
+            self.clear()
+            self.version = version
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: Hashable, value, version: int):
+        if version != self.version:
+            self.clear()
+            self.version = version
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old[1]
+        self._entries[key] = (value, size)
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.nbytes -= evicted
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def result_cache(graph, max_bytes: Optional[int] = None) -> ResultCache:
+    # Кэш создаётся при первом обращении и хранится в самом графе
+    cache = graph._result_cache
+    if cache is None:
+        cache = graph._result_cache = ResultCache(DEFAULT_MAX_BYTES if max_bytes is None else max_bytes)
+    elif max_bytes is not None:
+        cache.max_bytes = max_bytes
+    return cache
+
+
+def cached(graph, key: Hashable, compute: Callable[[], dict], stats=None, source: Optional[str] = None) -> dict:
+    """Возвращает копию результата из кэша графа, при промахе вычисляя его через compute().
+
+    stats (AlgorithmStats) получает счётчик cache_hits или cache_misses.
+    """
+    cache = result_cache(graph)
+    version = graph.version
+    value = cache.get(key, version)
+    if value is None:
+        value = compute()
+        cache.put(key, value, version)
+        if stats is not None:
+            stats.record(key[0], {'cache_misses': 1}, {}, source)
+    elif stats is not None:
+        stats.record(key[0], {'cache_hits': 1}, {}, source)
+    return _copy(value)
+
+
+def _copy(result: dict) -> dict:
+    # Результат — словарь расстояний или словарь строк (Флойд-Уоршелл)
+    if result and isinstance(next(iter(result.values())), dict):
+        return {u: dict(row) for u, row in result.items()}
+    return dict(result)
+
+
+def _estimate_size(result: dict) -> int:
+    if result and isinstance(next(iter(result.values())), dict):
+        return sys.getsizeof(result) + sum(_estimate_size(row) for row in result.values())
+    return sys.getsizeof(result) + _VALUE_BYTES * len(result)
@@ -0,0 +1,72 @@
+import json
+from typing import Dict, Optional
+
+
+class AlgorithmStats:
+    """Счётчики и время фаз одного запуска алгоритма.
+
+    Передаётся в алгоритм параметром stats; без него алгоритмы ничего не
+    собирают. Счётчики, которые можно вывести из результата (например, число
+    просмотренных рёбер Дейкстры), считаются уже после поиска.
+    """
+
+    def __init__(self):
+        self.algorithm: Optional[str] = None
+        self.source: Optional[str] = None
+        self.counters: Dict[str, int] = {}
+        self.phases: Dict[str, float] = {}
+
+    def record(self, algorithm: str, counters: dict, phases: dict, source: Optional[str] = None):
+        self.algorithm = algorithm
+        self.source = source
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        for name, seconds in phases.items():
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.phases.values())
+
+    def to_dict(self) -> dict:
+        return {
+            'algorithm': self.algorithm,
+            'source': self.source,
+            'counters': dict(self.counters),
+            'phases': dict(self.phases),
+            'total_seconds': self.total_seconds,
+        }
+
+    def save(self, filepath: str):
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def __str__(self):
+        lines = [f"Статистика ({self.algorithm}" + (f", источник '{self.source}'" if self.source else "") + "):"]
+        lines.extend(f"  {name}: {value}" for name, value in self.counters.items())
+        lines.extend(f"  время {name}: {seconds * 1000:.3f} мс" for name, seconds in self.phases.items())
+        return "\n".join(lines)
+
+
+class CallCounter:
+    """Обёртка функции, считающая её вызовы.
+
+    Подставляется вместо heapq.heappush и подобных функций только при сборе
+    статистики, поэтому обычный запуск не ведёт счётчиков внутри цикла.
+    """
+
+    __slots__ = ('function', 'calls')
+
+    def __init__(self, function):
+        self.function = function
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        return self.function(*args)
+
+
+def save_stats(stats_list, filepath: str):
+    # Несколько запусков в одном JSON-файле (список объектов)
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump([stats.to_dict() for stats in stats_list], f, ensure_ascii=False, indent=2)
@@ -1,8 +1,16 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from functools import partial
+
 from graph import Graph, GraphError
+from compact_graph import CompactGraph, SNAPSHOT_MAGIC
 from algorithms.floyd_warshall_algorithm import floyd_warshall
 from algorithms.dijkstra_algorithm import dijkstra
 from algorithms.bellman_ford_algorithm import bellman_ford
-from visualization_utils import visualize_steps, draw_dijkstra_step
+from algorithms.stats import AlgorithmStats, save_stats
 
 
 def print_menu():
@@ -18,6 +26,8 @@ def print_menu():
     print("9. Применить алгоритм Форда-Беллмана")
     print("10. Применить алгоритм Флойда-Уоршелла")
     print("11. Выход")
+    print("12. Включить/выключить статистику алгоритмов")
+    print("13. Экспортировать статистику последнего запуска в JSON")
 
 def input_vertex(prompt: str) -> str:
     v = input(prompt).strip()
@@ -25,7 +35,31 @@ def input_vertex(prompt: str) -> str:
         raise ValueError("Имя вершины не может быть пустым.")
     return v
 
-def main():
+def show_dijkstra_steps(graph, steps):
+    # networkx и matplotlib загружаются только при первой визуализации
+    try:
+        from visualization_utils import visualize_steps, DijkstraStepRenderer, default_layout_cache_dir
+    except ImportError as e:
+        print(f"Визуализация недоступна: {e}")
+        return
+    visualize_steps(graph, steps, renderer=DijkstraStepRenderer(), cache_dir=default_layout_cache_dir())
+
+def print_distances(start, distances, tree):
+    print(f"Кратчайшие расстояния от вершины '{start}':")
+    for vertex, dist in distances.items():
+        if dist == float('inf'):
+            print(f"  {vertex}: недостижимо")
+        else:
+            print(f"  {vertex}: {dist}  (путь: {' -> '.join(tree.path(vertex))})")
+
+def report_stats(stats, last_stats):
+    # Печатает статистику запуска и возвращает новый список для экспорта
+    if stats is None:
+        return last_stats
+    print(stats)
+    return [stats]
+
+def interactive():
     graph: Graph = None
 
     print("Создание графа")
@@ -43,6 +77,10 @@ def main():
         weighted = input("Взвешенный граф? (y/n): ").lower().startswith('y')
         graph = Graph(directed=directed, weighted=weighted)
 
+    # Статистика собирается только по запросу: без неё алгоритмы работают как обычно
+    collect_stats = False
+    last_stats = []
+
     while True:
         print_menu()
         choice = input("Выберите действие: ").strip()
@@ -94,11 +132,12 @@ def main():
                     continue
                 try:
                     start = input_vertex("Введите начальную вершину: ")
-                    distances, steps = dijkstra(graph, start, track_steps=True)
-                    print(f"Кратчайшие расстояния от вершины '{start}':")
-                    for vertex, dist in distances.items():
-                        print(f"  {vertex}: {dist if dist != float('inf') else 'недостижимо'}")
-                    visualize_steps(graph, steps, draw_dijkstra_step)
+                    stats = AlgorithmStats() if collect_stats else None
+                    distances, steps, tree = dijkstra(graph, start, track_steps=True, stats=stats,
+                                                      with_predecessors=True)
+                    print_distances(start, distances, tree)
+                    last_stats = report_stats(stats, last_stats)
+                    show_dijkstra_steps(graph, steps)
                 except GraphError as e:
                     print(f"Ошибка: {e}")
 
@@ -109,10 +148,10 @@ def main():
                 try:
 
                     start = input_vertex("Введите начальную вершину: ")
-                    distances = bellman_ford(graph, start)
-                    print(f"Кратчайшие расстояния от вершины '{start}':")
-                    for vertex, dist in distances.items():
-                        print(f"  {vertex}: {dist if dist != float('inf') else 'недостижимо'}")
+                    stats = AlgorithmStats() if collect_stats else None
+                    distances, tree = bellman_ford(graph, start, stats=stats, with_predecessors=True)
+                    print_distances(start, distances, tree)
+                    last_stats = report_stats(stats, last_stats)
                 except GraphError as e:
                     print(f"Ошибка: {e}")
 
@@ -122,7 +161,8 @@ def main():
                     continue
                 try:
 
-                    dist = floyd_warshall(graph)
+                    stats = AlgorithmStats() if collect_stats else None
+                    dist, next_hop = floyd_warshall(graph, stats=stats, with_predecessors=True)
                     print("Кратчайшие расстояния между всеми парами вершин:")
                     vertices = sorted(dist.keys())
                     header = "     " + "  ".join(f"{v:>5}" for v in vertices)
@@ -134,6 +174,12 @@ def main():
                             val = f"{d:.1f}" if d != float('inf') else "inf"
                             row += f"  {val:>5}"
                         print(row)
+                    last_stats = report_stats(stats, last_stats)
+                    if input("Показать путь между двумя вершинами? (y/n): ").lower().startswith('y'):
+                        u = input_vertex("Введите начальную вершину: ")
+                        v = input_vertex("Введите конечную вершину: ")
+                        path = next_hop.path(u, v)
+                        print(" -> ".join(path) if path else f"Путь из '{u}' в '{v}' не существует.")
                 except GraphError as e:
                     print(f"Ошибка: {e}")
 
@@ -141,12 +187,205 @@ def main():
                 print("Выход.")
                 break
 
+            elif choice == '12':
+                collect_stats = not collect_stats
+                print(f"Статистика алгоритмов {'включена' if collect_stats else 'выключена'}.")
+
+            elif choice == '13':
+                if not last_stats:
+                    print("Статистика ещё не собиралась. Включите её (пункт 12) и запустите алгоритм.")
+                    continue
+                path = input("Введите путь к JSON-файлу: ").strip()
+                save_stats(last_stats, path)
+                print(f"Статистика сохранена в '{path}'.")
+
             else:
                 print("Неверный выбор. Попробуйте снова.")
 
         except (GraphError, ValueError) as e:
             print(f"Ошибка: {e}")
 
+BATCH_ALGORITHMS = ('auto', 'dijkstra', 'bellman_ford', 'floyd_warshall', 'johnson')
+
+
+def load_graph(path: str) -> CompactGraph:
+    # Снимок (см. Graph.save_snapshot) отображается в память, текстовый файл читается и замораживается
+    with open(path, 'rb') as f:
+        is_snapshot = f.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+    if is_snapshot:
+        return CompactGraph.load(path)
+    return Graph.from_file(path).freeze()
+
+
+def read_queries(path: str) -> list:
+    # Строка запроса: "источник" или "источник цель"; пустые строки и # — комментарии
+    queries = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if not parts or parts[0].startswith('#'):
+                continue
+            if len(parts) > 2:
+                raise ValueError(f"Некорректная строка запроса: '{line.strip()}'.")
+            queries.append((parts[0], parts[1] if len(parts) == 2 else None))
+    return queries
+
+
+def run_queries(graph: CompactGraph, queries, algorithm: str = 'auto', workers=None, stats_list=None,
+                with_paths: bool = False):
+    """Выполняет запросы кратчайших расстояний к загруженному графу.
+
+    Запросы группируются по источнику, каждый источник считается один раз.
+    Выдаёт тройки (источник, цель, расстояние); порядок источников может
+    отличаться от порядка запросов при workers > 1.
+    Если передан список stats_list, в него добавляется AlgorithmStats каждого
+    запуска; Дейкстра тогда считается по источникам в одном процессе.
+    При with_paths=True к тройке добавляется список вершин пути (пустой, если
+    пути нет); пути восстанавливаются по деревьям предков без повторного поиска.
+    """
+    if not graph.weighted:
+        raise GraphError("Поиск кратчайших путей применим только к взвешенным графам.")
+    targets = {}
+    for source, target in queries:
+        graph.vertex_id(source)
+        if target is not None:
+            graph.vertex_id(target)
+        # None — нужны расстояния до всех вершин
+        if target is None or source in targets and targets[source] is None:
+            targets[source] = None
+        else:
+            targets.setdefault(source, []).append(target)
+
+    # Статистика и пути собираются в одном процессе, без пула all_pairs_shortest_paths
+    single = stats_list is not None or with_paths
+    if single and algorithm == 'auto':
+        algorithm = 'bellman_ford' if graph.has_negative_weights() else 'dijkstra'
+    if with_paths and algorithm == 'johnson':
+        raise GraphError("Восстановление путей для алгоритма Джонсона не поддерживается.")
+
+    if algorithm == 'bellman_ford' or single and algorithm == 'dijkstra':
+        rows = _rows_per_source(graph, targets, bellman_ford if algorithm == 'bellman_ford' else dijkstra,
+                                stats_list, with_paths)
+    elif single and algorithm == 'floyd_warshall':
+        stats = None
+        if stats_list is not None:
+            stats = AlgorithmStats()
+            stats_list.append(stats)
+        result = floyd_warshall(graph, engine=_matrix_engine(), stats=stats, with_predecessors=with_paths)
+        if with_paths:
+            dist, next_hop = result
+            rows = ((source, dist[source], partial(next_hop.path, source)) for source in targets)
+        else:
+            rows = ((source, result[source], None) for source in targets)
+    else:
+        from algorithms.all_pairs import all_pairs_shortest_paths
+        rows = ((source, row, None) for source, row in
+                all_pairs_shortest_paths(graph, workers=workers, method=algorithm, sources=list(targets)))
+
+    for source, row, path in rows:
+        wanted = targets[source]
+        for target in (row if wanted is None else wanted):
+            if with_paths:
+                yield source, target, row[target], path(target)
+            else:
+                yield source, target, row[target]
+
+
+def _rows_per_source(graph, sources, run, stats_list, with_paths=False):
+    for source in sources:
+        stats = None
+        if stats_list is not None:
+            stats = AlgorithmStats()
+            stats_list.append(stats)
+        if with_paths:
+            row, tree = run(graph, source, stats=stats, with_predecessors=True)
+            yield source, row, tree.path
+        else:
+            yield source, run(graph, source, stats=stats), None
+
+
+def _matrix_engine() -> str:
+    try:
+        import numpy  # noqa: F401
+        return 'numpy'
+    except ImportError:
+        return 'python'
+
+
+def write_results(results, out, fmt: str, with_paths: bool = False) -> int:
+    # Строки результатов — тройки или, при with_paths, четвёрки с путём
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(('source', 'target', 'distance') + (('path',) if with_paths else ()))
+        for source, target, dist, *path in results:
+            row = (source, target, dist if dist != float('inf') else 'inf')
+            if with_paths:
+                # Вершины пути через пробел (имена вершин не содержат пробелов, как в файле графа)
+                row += (' '.join(path[0]),)
+            writer.writerow(row)
+            count += 1
+        return count
+    # JSON Lines: по одному объекту на пару; недостижимость — null
+    for source, target, dist, *path in results:
+        item = {'source': source, 'target': target, 'distance': dist if dist != float('inf') else None}
+        if with_paths:
+            item['path'] = path[0] or None
+        out.write(json.dumps(item, ensure_ascii=False))
+        out.write('\n')
+        count += 1
+    return count
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        interactive()
+        return
+
+    parser = argparse.ArgumentParser(description="Пакетный поиск кратчайших расстояний.")
+    parser.add_argument('--graph', required=True, help="файл графа или снимок (Graph.save_snapshot)")
+    parser.add_argument('--algorithm', choices=BATCH_ALGORITHMS, default='auto')
+    parser.add_argument('--source', action='append', default=[], help="источник (можно повторять)")
+    parser.add_argument('--queries', help="файл запросов: в каждой строке 'источник [цель]'")
+    parser.add_argument('--format', choices=('json', 'csv'), default='json')
+    parser.add_argument('--output', help="файл результатов (по умолчанию stdout)")
+    parser.add_argument('--workers', type=int, default=None, help="число процессов для Дейкстры")
+    parser.add_argument('--paths', action='store_true',
+                        help="выводить вершины кратчайших путей (без пула процессов; не для johnson)")
+    parser.add_argument('--stats', help="сохранить статистику алгоритмов в JSON (без пула процессов; "
+                                        "для johnson не собирается)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        graph = load_graph(args.graph)
+        queries = [(source, None) for source in args.source]
+        if args.queries:
+            queries.extend(read_queries(args.queries))
+        if not queries:
+            queries = [(vertex, None) for vertex in graph.vertices]
+        loaded = time.perf_counter()
+
+        out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+        try:
+            stats_list = [] if args.stats else None
+            results = run_queries(graph, queries, args.algorithm, args.workers, stats_list, args.paths)
+            count = write_results(results, out, args.format, args.paths)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        if stats_list is not None:
+            save_stats(stats_list, args.stats)
+    except (GraphError, OSError, ValueError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    finished = time.perf_counter()
+    print(f"Граф загружен за {loaded - started:.3f} с; {len(queries)} запросов, "
+          f"{count} расстояний за {finished - loaded:.3f} с", file=sys.stderr)
+
+
 if __name__ == '__main__':
     main()
 
@@ -0,0 +1,122 @@
+"""Генераторы синтетических графов (формат Graph.from_file) и лабиринтов (формат maze/labirint.py)."""
+import random
+from typing import Dict, List, Optional, Tuple
+
+Edges = Dict[str, List[Tuple[str, Optional[float]]]]
+
+
+def write_graph(filepath: str, edges: Edges, directed: bool, weighted: bool):
+    # Для неориентированного графа каждое ребро записывается один раз: обратное добавит from_file
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(f"{directed} {weighted}\n")
+        if weighted:
+            f.writelines(" ".join([u] + [f"{v}:{w}" for v, w in out]) + "\n" for u, out in edges.items())
+        else:
+            f.writelines(" ".join([u] + [v for v, _ in out]) + "\n" for u, out in edges.items())
+
+
+def _empty(n: int) -> Edges:
+    return {str(i): [] for i in range(n)}
+
+
+def _weight(rng: random.Random, weighted: bool, max_weight: float) -> Optional[float]:
+    if not weighted:
+        return None
+    return round(rng.uniform(1, max_weight), 2)
+
+
+def random_graph(n: int, m: int, directed: bool = True, weighted: bool = True, seed: int = 0,
+                 max_weight: float = 100.0, negative: bool = False) -> Edges:
+    """Случайный граф G(n, m) без петель.
+
+    При negative=True (только для ориентированного графа) к весу ребра u -> v
+    добавляется p(u) - p(v) со случайными потенциалами p: часть весов становится
+    отрицательной, а вес любого цикла не меняется, поэтому отрицательных циклов нет.
+    """
+    rng = random.Random(seed)
+    edges = _empty(n)
+    if n < 2:
+        return edges
+    shift = negative and directed and weighted
+    potentials = [rng.uniform(0, max_weight) for _ in range(n)] if shift else None
+    for _ in range(m):
+        u, v = rng.randrange(n), rng.randrange(n - 1)
+        if v >= u:
+            v += 1
+        w = _weight(rng, weighted, max_weight)
+        if shift:
+            w = round(w + potentials[u] - potentials[v], 2)
+        edges[str(u)].append((str(v), w))
+    return edges
+
+
+def dense_graph(n: int, density: float = 0.5, **kwargs) -> Edges:
+    return random_graph(n, int(density * n * (n - 1)), **kwargs)
+
+
+def grid_graph(rows: int, cols: int, weighted: bool = True, seed: int = 0,
+               max_weight: float = 100.0) -> Edges:
+    # Неориентированная решётка rows x cols, вершины "i_j"
+    rng = random.Random(seed)
+    edges = {f"{i}_{j}": [] for i in range(rows) for j in range(cols)}
+    for i in range(rows):
+        for j in range(cols):
+            out = edges[f"{i}_{j}"]
+            if j + 1 < cols:
+                out.append((f"{i}_{j + 1}", _weight(rng, weighted, max_weight)))
+            if i + 1 < rows:
+                out.append((f"{i + 1}_{j}", _weight(rng, weighted, max_weight)))
+    return edges
+
+
+def scale_free_graph(n: int, edges_per_vertex: int = 3, directed: bool = True, weighted: bool = True,
+                     seed: int = 0, max_weight: float = 100.0) -> Edges:
+    # Модель Барабаши-Альберт: новая вершина соединяется с уже существующими пропорционально их степени
+    rng = random.Random(seed)
+    edges = _empty(n)
+    ends: List[int] = []
+    for v in range(n):
+        targets = set()
+        limit = min(edges_per_vertex, v)
+        while len(targets) < limit:
+            targets.add(rng.choice(ends) if ends and rng.random() < 0.9 else rng.randrange(v))
+        for t in targets:
+            edges[str(v)].append((str(t), _weight(rng, weighted, max_weight)))
+            ends.extend((v, t))
+    return edges
+
+
+def random_maze(filepath: str, rows: int, cols: int, seed: int = 0, loops: float = 0.05):
+    """Лабиринт rows x cols: остовное дерево, прорубленное обходом в глубину, плюс доля
+    loops случайно снесённых стен (циклы). S — в левом верхнем углу, E — в правом нижнем; путь существует всегда."""
+    rng = random.Random(seed)
+    grid = [bytearray(b'#' * cols) for _ in range(rows)]
+    cells_r, cells_c = (rows + 1) // 2, (cols + 1) // 2
+    seen = bytearray(cells_r * cells_c)
+    stack = [(0, 0)]
+    seen[0] = 1
+    grid[0][0] = ord('.')
+    while stack:
+        r, c = stack[-1]
+        options = [(r + dr, c + dc) for dr, dc in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                   if 0 <= r + dr < cells_r and 0 <= c + dc < cells_c and not seen[(r + dr) * cells_c + c + dc]]
+        if not options:
+            stack.pop()
+            continue
+        nr, nc = rng.choice(options)
+        seen[nr * cells_c + nc] = 1
+        grid[2 * nr][2 * nc] = ord('.')
+        grid[r + nr][c + nc] = ord('.')
+        stack.append((nr, nc))
+
+    for _ in range(int(loops * rows * cols)):
+        r, c = rng.randrange(rows), rng.randrange(cols)
+        if (r + c) % 2:
+            grid[r][c] = ord('.')
+
+    # При чётных размерах последняя строка и столбец остаются стеной, E ставится в последнюю клетку-узел
+    er, ec = 2 * (cells_r - 1), 2 * (cells_c - 1)
+    grid[0][0] = ord('S')
+    grid[er][ec] = ord('E')
+    with open(filepath, 'wb') as f:
+        f.writelines(bytes(line) + b'\n' for line in grid)
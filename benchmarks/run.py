@@ -0,0 +1,170 @@
+"""Замеры времени и пиковой памяти алгоритмов на синтетических данных.
+
+Запуск из корня репозитория:
+    python benchmarks/run.py --preset small -o bench.json
+    python benchmarks/run.py --preset small --compare bench.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, 'maze'), os.path.dirname(os.path.abspath(__file__))):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from graph import Graph  # noqa: E402
+from algorithms.dijkstra_algorithm import dijkstra  # noqa: E402
+from algorithms.bellman_ford_algorithm import bellman_ford  # noqa: E402
+from algorithms.floyd_warshall_algorithm import floyd_warshall  # noqa: E402
+from labirint import MazeSolver  # noqa: E402
+import generators  # noqa: E402
+
+# Размеры задач: число вершин разреженных графов, плотного графа (для Флойда-Уоршелла),
+# сторона решётки и лабиринта
+PRESETS = {
+    'small': {'sparse': 2000, 'dense': 120, 'grid': 40, 'scale_free': 2000, 'maze': 101},
+    'medium': {'sparse': 20000, 'dense': 300, 'grid': 150, 'scale_free': 20000, 'maze': 501},
+    'large': {'sparse': 200000, 'dense': 800, 'grid': 500, 'scale_free': 200000, 'maze': 1501},
+}
+# Относительное замедление, при котором --compare сообщает о регрессии
+DEFAULT_THRESHOLD = 0.10
+
+
+def measure(fn, repeat: int = 3) -> dict:
+    """Время (минимум и медиана по repeat запускам) и пик памяти отдельного запуска под tracemalloc."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+
+    # Память меряется отдельным запуском: tracemalloc заметно замедляет выполнение
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': min(times), 'median_seconds': statistics.median(times), 'peak_bytes': peak}
+
+
+def build_cases(preset: dict, workdir: str) -> dict:
+    # Каждый случай — функция без аргументов; данные генерируются и загружаются заранее
+    cases = {}
+    files = {
+        'sparse': (generators.random_graph(preset['sparse'], 5 * preset['sparse'], seed=1), True),
+        'negative': (generators.random_graph(preset['sparse'], 5 * preset['sparse'], seed=2, negative=True), True),
+        'dense': (generators.dense_graph(preset['dense'], 0.5, seed=3), True),
+        'grid': (generators.grid_graph(preset['grid'], preset['grid'], seed=4), False),
+        'scale_free': (generators.scale_free_graph(preset['scale_free'], seed=5), True),
+    }
+    graphs = {}
+    for name, (edges, directed) in files.items():
+        path = os.path.join(workdir, f'{name}.txt')
+        generators.write_graph(path, edges, directed=directed, weighted=True)
+        graphs[name] = Graph.from_file(path)
+        cases[f'load/{name}'] = lambda path=path: Graph.from_file(path)
+    export_path = os.path.join(workdir, 'export.txt')
+    cases['export/sparse'] = lambda: graphs['sparse'].export_to_file(export_path)
+
+    for name in ('sparse', 'grid', 'scale_free'):
+        graph = graphs[name]
+        # В безмасштабном графе рёбра ведут от новых вершин к старым: источник — последняя вершина
+        source = list(graph.adjacency_list)[-1]
+        cases[f'dijkstra/{name}'] = lambda graph=graph, source=source: dijkstra(graph, source)
+    frozen = graphs['sparse'].freeze()
+    cases['dijkstra/sparse_compact'] = lambda: dijkstra(frozen, '0')
+    cases['bellman_ford/negative'] = lambda: bellman_ford(graphs['negative'], '0')
+    cases['floyd_warshall/dense'] = lambda: floyd_warshall(graphs['dense'])
+    try:
+        import numpy  # noqa: F401
+        cases['floyd_warshall/dense_numpy'] = lambda: floyd_warshall(graphs['dense'], engine='numpy')
+    except ImportError:
+        pass
+
+    maze_path = os.path.join(workdir, 'maze.txt')
+    generators.random_maze(maze_path, preset['maze'], preset['maze'], seed=6)
+    for algorithm in ('bfs', 'astar', 'bidirectional', 'jps'):
+        cases[f'maze/{algorithm}'] = lambda algorithm=algorithm: MazeSolver(maze_path, algorithm).solve()
+    return cases
+
+
+def run(preset_name: str, repeat: int, only=None) -> dict:
+    preset = PRESETS[preset_name]
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        cases = build_cases(preset, workdir)
+        for name, fn in cases.items():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            results[name] = measure(fn, repeat)
+            print(f"{name:32} {results[name]['seconds']:10.4f} с {results[name]['peak_bytes'] / 2 ** 20:10.2f} МиБ",
+                  file=sys.stderr)
+    return {
+        'meta': {
+            'preset': preset_name,
+            'sizes': preset,
+            'repeat': repeat,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(old: dict, new: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """Печатает сравнение двух прогонов и возвращает имена случаев, замедлившихся больше чем на threshold."""
+    regressions = []
+    if old['meta'].get('preset') != new['meta'].get('preset'):
+        print("Внимание: прогоны сделаны с разными наборами размеров.", file=sys.stderr)
+    print(f"{'случай':32} {'было, с':>10} {'стало, с':>10} {'время':>8} {'память':>8}")
+    for name, result in new['results'].items():
+        before = old['results'].get(name)
+        if before is None:
+            print(f"{name:32} {'—':>10} {result['seconds']:10.4f}")
+            continue
+        ratio = result['seconds'] / before['seconds'] if before['seconds'] else float('inf')
+        memory = result['peak_bytes'] / before['peak_bytes'] if before['peak_bytes'] else float('inf')
+        mark = ''
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            mark = '  регрессия'
+        print(f"{name:32} {before['seconds']:10.4f} {result['seconds']:10.4f} {ratio:7.2f}x {memory:7.2f}x{mark}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки алгоритмов на синтетических графах и лабиринтах.")
+    parser.add_argument('--preset', choices=list(PRESETS), default='small')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='*', help="префиксы имён случаев, например dijkstra maze/bfs")
+    parser.add_argument('-o', '--output', help="сохранить результаты в JSON")
+    parser.add_argument('--compare', help="JSON предыдущего прогона для сравнения")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="допустимое относительное замедление при сравнении")
+    args = parser.parse_args(argv)
+
+    report = run(args.preset, args.repeat, args.only)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            old = json.load(f)
+        if compare(old, report, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+import mmap
+import struct
+import sys
+from array import array
+from typing import Dict, List, Optional, Iterator, Tuple
+
+from graph import Graph, GraphError
+
+# Формат снимка: заголовок, таблица имён вершин (UTF-8, разделитель \0),
+# затем offsets (int64), targets (int32) и weights (float64), каждый блок выровнен на 8 байт
+SNAPSHOT_MAGIC = b'TGCSR\x00\x01\x00'
+_HEADER = struct.Struct('<8sBBB5xQQQ')
+
+
+class CompactGraph:
+    """Неизменяемое компактное представление графа в формате CSR.
+
+    Имена вершин интернируются в целые номера 0..n-1; рёбра вершины с
+    номером i лежат в targets[offsets[i]:offsets[i + 1]] (и соответствующих
+    элементах weights). Порядок рёбер совпадает с порядком в adjacency_list.
+    """
+
+    def __init__(self, vertices: List[str], offsets: array, targets: array,
+                 weights: Optional[array], directed: bool = False, weighted: bool = False):
+        self.vertices = vertices
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(vertices)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.directed = directed
+        self.weighted = weighted
+        self._has_negative_weights: Optional[bool] = None
+        self._max_integer_weight: Optional[int] = None
+        # Граф неизменяем, версия всегда 0 (см. Graph.version)
+        self.version = 0
+        self._result_cache = None
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> 'CompactGraph':
+        vertices = list(graph.adjacency_list)
+        index = {name: i for i, name in enumerate(vertices)}
+
+        offsets = array('q', [0])
+        targets = array('i')
+        weights = array('d') if graph.weighted else None
+
+        total = 0
+        for u in vertices:
+            edges = graph.adjacency_list[u]
+            targets.extend([index[v] for v, _ in edges])
+            if weights is not None:
+                weights.extend([w for _, w in edges])
+            total += len(edges)
+            offsets.append(total)
+
+        return cls(vertices, offsets, targets, weights,
+                   directed=graph.directed, weighted=graph.weighted)
+
+    def to_graph(self) -> Graph:
+        graph = Graph(directed=self.directed, weighted=self.weighted)
+        vertices = self.vertices
+        for i, u in enumerate(vertices):
+            lo, hi = self.offsets[i], self.offsets[i + 1]
+            if self.weights is not None:
+                graph.adjacency_list[u] = [(vertices[self.targets[e]], self.weights[e]) for e in range(lo, hi)]
+            else:
+                graph.adjacency_list[u] = [(vertices[self.targets[e]], None) for e in range(lo, hi)]
+        return graph
+
+    def save(self, filepath: str):
+        names = '\0'.join(self.vertices).encode('utf-8')
+        n, m = self.vertex_count, self.edge_count
+        with open(filepath, 'wb') as f:
+            f.write(_HEADER.pack(SNAPSHOT_MAGIC, self.directed, self.weighted,
+                                 sys.byteorder == 'little', n, m, len(names)))
+            f.write(names)
+            f.write(bytes(_padding(len(names))))
+            f.write(memoryview(self.offsets).cast('B'))
+            f.write(memoryview(self.targets).cast('B'))
+            f.write(bytes(_padding(4 * m)))
+            if self.weights is not None:
+                f.write(memoryview(self.weights).cast('B'))
+
+    @classmethod
+    def load(cls, filepath: str, use_mmap: bool = True) -> 'CompactGraph':
+        """Загружает снимок, сохранённый методом save.
+
+        При use_mmap=True массивы рёбер отображаются из файла без копирования,
+        и несколько процессов могут совместно читать один и тот же снимок.
+        """
+        with open(filepath, 'rb') as f:
+            if use_mmap:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                data = f.read()
+
+        if len(data) < _HEADER.size:
+            raise GraphError(f"File '{filepath}' is not a graph snapshot.")
+        magic, directed, weighted, little, n, m, names_len = _HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC:
+            raise GraphError(f"File '{filepath}' is not a graph snapshot.")
+        if bool(little) != (sys.byteorder == 'little'):
+            raise GraphError("Snapshot was written on a machine with different byte order.")
+
+        view = memoryview(data)
+        pos = _HEADER.size
+        names = bytes(view[pos:pos + names_len]).decode('utf-8')
+        vertices = names.split('\0') if n else []
+        pos += names_len + _padding(names_len)
+
+        # Без mmap данные копируются в обычные массивы, и буфер файла можно освободить
+        load_array = (lambda code, chunk: chunk.cast(code)) if use_mmap else _to_array
+
+        offsets = load_array('q', view[pos:pos + 8 * (n + 1)])
+        pos += 8 * (n + 1)
+        targets = load_array('i', view[pos:pos + 4 * m])
+        pos += 4 * m + _padding(4 * m)
+        weights = load_array('d', view[pos:pos + 8 * m]) if weighted else None
+        return cls(vertices, offsets, targets, weights, directed=bool(directed), weighted=bool(weighted))
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.vertices)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def vertex_id(self, vertex: str) -> int:
+        try:
+            return self.index[vertex]
+        except KeyError:
+            raise GraphError(f"Vertex '{vertex}' does not exist.") from None
+
+    def neighbors(self, u: int) -> Iterator[Tuple[int, Optional[float]]]:
+        lo, hi = self.offsets[u], self.offsets[u + 1]
+        if self.weights is None:
+            for e in range(lo, hi):
+                yield self.targets[e], None
+        else:
+            for e in range(lo, hi):
+                yield self.targets[e], self.weights[e]
+
+    def has_negative_weights(self) -> bool:
+        if self._has_negative_weights is None:
+            self._has_negative_weights = self.weights is not None and any(w < 0 for w in self.weights)
+        return self._has_negative_weights
+
+    def max_integer_weight(self) -> Optional[int]:
+        # Наибольший вес, если все веса — целые неотрицательные числа, иначе None
+        if self._max_integer_weight is None:
+            weights = self.weights
+            if weights is None or not all(w >= 0 and w.is_integer() for w in weights):
+                self._max_integer_weight = -1
+            else:
+                self._max_integer_weight = int(max(weights, default=0))
+        return self._max_integer_weight if self._max_integer_weight >= 0 else None
+
+    def nbytes(self) -> int:
+        # Размер числовых буферов (без таблицы имён вершин)
+        size = self.offsets.itemsize * len(self.offsets) + self.targets.itemsize * len(self.targets)
+        if self.weights is not None:
+            size += self.weights.itemsize * len(self.weights)
+        return size
+
+    def __str__(self):
+        return (f"CompactGraph(directed={self.directed}, weighted={self.weighted}, "
+                f"vertices={self.vertex_count}, edges={self.edge_count})")
+
+
+def _padding(size: int) -> int:
+    return -size % 8
+
+
+def _to_array(typecode: str, view: memoryview) -> array:
+    result = array(typecode)
+    result.frombytes(view)
+    return result
@@ -1,15 +1,40 @@
-from typing import Dict, List, Tuple, Optional, Union
-import copy
+from collections import Counter
+from typing import Dict, Iterator, List, Set, Tuple, Optional, Union, TYPE_CHECKING
 import os
 
+if TYPE_CHECKING:
+    from compact_graph import CompactGraph
+
 class GraphError(Exception):
     pass
 
+class NegativeCycleError(GraphError):
+    def __init__(self, message: str, cycle: Optional[List[str]] = None):
+        super().__init__(message)
+        self.cycle = cycle or []
+
 class Graph:
     def __init__(self, directed: bool = False, weighted: bool = False):
         self.adjacency_list: Dict[str, List[Tuple[str, Optional[float]]]] = {}
         self.directed = directed
         self.weighted = weighted
+        self._has_negative_weights: Optional[bool] = None
+        self._reverse_adjacency: Optional[Dict[str, List[Tuple[str, Optional[float]]]]] = None
+        # Индекс соседей: u -> {v: число рёбер u->v}; для ориентированного графа
+        # отдельно хранится обратный индекс v -> {u: число рёбер u->v}.
+        # Нужен только удалениям, поэтому строится при первом удалении (None — ещё не построен),
+        # а загрузка и добавление рёбер без удалений за него не платят
+        self._out_index: Optional[Dict[str, Dict[str, int]]] = None
+        self._in_index: Optional[Dict[str, Dict[str, int]]] = None
+        # Copy-on-write: после copy() внешние словари и списки соседей общие с другим графом.
+        # _owned — вершины, чьи списки и индексы уже скопированы (None — граф владеет всем)
+        self._shares_outer = False
+        self._owned: Optional[Set[str]] = None
+        # Номер версии растёт при каждом изменении графа; по нему сбрасывается кэш результатов
+        self.version = 0
+        self._result_cache = None
+        # Последний результат freeze(): (версия, CompactGraph)
+        self._frozen = None
 
     @classmethod
     def from_file(cls, filepath: str) -> 'Graph':
@@ -17,42 +42,193 @@ class Graph:
             raise FileNotFoundError(f"File '{filepath}' does not exist.")
 
         with open(filepath, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        header = lines[0].strip().split()
-        if len(header) != 2:
-            raise GraphError("Invalid header in file. Expected: '<directed> <weighted>'")
+            header = f.readline().split()
+            if len(header) != 2:
+                raise GraphError("Invalid header in file. Expected: '<directed> <weighted>'")
 
-        directed = header[0].lower() == 'true'
-        weighted = header[1].lower() == 'true'
+            directed = header[0].lower() == 'true'
+            weighted = header[1].lower() == 'true'
 
-        graph = cls(directed=directed, weighted=weighted)
+            graph = cls(directed=directed, weighted=weighted)
 
-        for line in lines[1:]:
-            parts = line.strip().split()
-            if not parts:
-                continue
-            src = parts[0]
-            graph.add_vertex(src)
-            for edge in parts[1:]:
+            # Файл читается построчно, рёбра строки добавляются одним пакетом. По скорости
+            # это не быстрее поштучного add_edge: время уходит на создание строк, чисел и
+            # кортежей рёбер. Для быстрой повторной загрузки есть save_snapshot/from_snapshot
+            for line in f:
+                parts = line.split()
+                if not parts:
+                    continue
                 if weighted:
-                    if ':' not in edge:
-                        raise GraphError(f"Expected weight in format 'vertex:weight', got '{edge}'")
-                    dst, weight = edge.split(':')
-                    graph.add_edge(src, dst, float(weight))
+                    edges = []
+                    for edge in parts[1:]:
+                        dst, sep, weight = edge.partition(':')
+                        if not sep or not dst or not weight or ':' in weight:
+                            raise GraphError(f"Expected weight in format 'vertex:weight', got '{edge}'")
+                        edges.append((dst, float(weight)))
                 else:
-                    graph.add_edge(src, edge)
+                    edges = [(dst, None) for dst in parts[1:]]
+                graph._add_edges(parts[0], edges)
         return graph
 
+    @classmethod
+    def from_snapshot(cls, filepath: str) -> 'Graph':
+        from compact_graph import CompactGraph
+        return CompactGraph.load(filepath, use_mmap=False).to_graph()
+
+    def save_snapshot(self, filepath: str):
+        self.freeze().save(filepath)
+
     @classmethod
     def copy(cls, other: 'Graph') -> 'Graph':
+        # Копия за O(1): данные копируются лениво, по вершинам, при первом изменении любого из графов
         new_graph = cls(directed=other.directed, weighted=other.weighted)
-        new_graph.adjacency_list = copy.deepcopy(other.adjacency_list)
+        new_graph.adjacency_list = other.adjacency_list
+        new_graph._out_index = other._out_index
+        new_graph._in_index = other._in_index
+        new_graph._has_negative_weights = other._has_negative_weights
+        for graph in (new_graph, other):
+            graph._shares_outer = True
+            graph._owned = set()
         return new_graph
 
+    def snapshot(self) -> 'Graph':
+        return type(self).copy(self)
+
+    def diff(self, other: 'Graph') -> dict:
+        # Изменения, переводящие other в self. Общие с other списки соседей не сравниваются
+        mine, theirs = self.adjacency_list, other.adjacency_list
+        added, removed = Counter(), Counter()
+        if mine is not theirs:
+            for u, edges in mine.items():
+                old_edges = theirs.get(u)
+                if edges is old_edges:
+                    continue
+                added.update((u, v, w) for v, w in edges)
+                if old_edges is not None:
+                    removed.update((u, v, w) for v, w in old_edges)
+            for u, old_edges in theirs.items():
+                if u not in mine:
+                    removed.update((u, v, w) for v, w in old_edges)
+
+        common = added & removed
+        added, removed = added - common, removed - common
+        return {
+            'added_vertices': [u for u in mine if u not in theirs],
+            'removed_vertices': [u for u in theirs if u not in mine],
+            'added_edges': self._counted_edges(added),
+            'removed_edges': self._counted_edges(removed),
+        }
+
+    def _counted_edges(self, counts: Counter) -> List[Tuple[str, str, Optional[float]]]:
+        if self.directed:
+            return list(counts.elements())
+        # Неориентированное ребро записано в списках обоих концов (петля — дважды в одном)
+        merged = Counter()
+        for (u, v, w), count in counts.items():
+            merged[(min(u, v), max(u, v), w)] += count
+        return [edge for edge, count in merged.items() for _ in range(count // 2)]
+
+    def _detach(self):
+        if self._shares_outer:
+            self.adjacency_list = dict(self.adjacency_list)
+            if self._out_index is not None:
+                self._out_index = dict(self._out_index)
+                self._in_index = dict(self._in_index) if self.directed else self._out_index
+            self._shares_outer = False
+
+    def _own(self, vertex: str):
+        self._detach()
+        if self._owned is not None and vertex not in self._owned:
+            self.adjacency_list[vertex] = list(self.adjacency_list[vertex])
+            if self._out_index is not None:
+                self._out_index[vertex] = dict(self._out_index[vertex])
+                if self.directed:
+                    self._in_index[vertex] = dict(self._in_index[vertex])
+            self._owned.add(vertex)
+
+    def freeze(self) -> 'CompactGraph':
+        # CompactGraph неизменяем, поэтому пока граф не менялся, отдаётся тот же снимок
+        if self._frozen is None or self._frozen[0] != self.version:
+            from compact_graph import CompactGraph
+            self._frozen = (self.version, CompactGraph.from_graph(self))
+        return self._frozen[1]
+
+    def has_negative_weights(self) -> bool:
+        if self._has_negative_weights is None:
+            self._has_negative_weights = any(
+                w is not None and w < 0 for edges in self.adjacency_list.values() for _, w in edges)
+        return self._has_negative_weights
+
+    def reverse_adjacency(self) -> Dict[str, List[Tuple[str, Optional[float]]]]:
+        # Входящие рёбра вершин; для неориентированного графа совпадают с исходящими
+        if not self.directed:
+            return self.adjacency_list
+        if self._reverse_adjacency is None:
+            reverse = {u: [] for u in self.adjacency_list}
+            for u, edges in self.adjacency_list.items():
+                for v, w in edges:
+                    reverse[v].append((u, w))
+            self._reverse_adjacency = reverse
+        return self._reverse_adjacency
+
+    def has_edge(self, u: str, v: str) -> bool:
+        if self._out_index is not None:
+            return v in self._out_index.get(u, ())
+        return any(x == v for x, _ in self.adjacency_list.get(u, ()))
+
+    def _neighbour_index(self) -> Tuple[Dict[str, Dict[str, int]], Dict[str, Dict[str, int]]]:
+        # Индекс (исходящий, входящий), построенный при первом обращении
+        if self._out_index is None:
+            self._build_index()
+        return self._out_index, self._in_index
+
+    def _build_index(self):
+        # Индекс по текущему adjacency_list за O(V + E). Граф, делящий данные с копией,
+        # строит собственный индекс: словари копии не затрагиваются
+        out_index = {u: {} for u in self.adjacency_list}
+        for u, edges in self.adjacency_list.items():
+            counts = out_index[u]
+            for v, _ in edges:
+                counts[v] = counts.get(v, 0) + 1
+        self._out_index = out_index
+        if self.directed:
+            self._in_index = {u: {} for u in self.adjacency_list}
+            for u, counts in out_index.items():
+                for v, count in counts.items():
+                    self._in_index[v][u] = count
+        else:
+            self._in_index = out_index
+
+    def _index_edge(self, u: str, v: str):
+        counts = self._out_index[u]
+        counts[v] = counts.get(v, 0) + 1
+        if self.directed:
+            counts = self._in_index[v]
+            counts[u] = counts.get(u, 0) + 1
+        elif u != v:
+            counts = self._out_index[v]
+            counts[u] = counts.get(u, 0) + 1
+        else:
+            counts[u] += 1
+
+    def _changed(self, removed: bool = False):
+        # Сброс данных, вычисленных по текущей структуре графа
+        self.version += 1
+        self._reverse_adjacency = None
+        if removed and self._has_negative_weights:
+            self._has_negative_weights = None
+
     def add_vertex(self, vertex: str):
         if vertex not in self.adjacency_list:
+            self._detach()
+            if self._owned is not None:
+                self._owned.add(vertex)
             self.adjacency_list[vertex] = []
+            if self._out_index is not None:
+                self._out_index[vertex] = {}
+                if self.directed:
+                    self._in_index[vertex] = {}
+            self._changed()
 
     def add_edge(self, u: str, v: str, weight: Optional[float] = None):
         if self.weighted and weight is None:
@@ -64,49 +240,119 @@ class Graph:
             self.add_vertex(u)
         if v not in self.adjacency_list:
             self.add_vertex(v)
+        self._own(u)
+        self._own(v)
 
         self.adjacency_list[u].append((v, weight))
         if not self.directed:
             self.adjacency_list[v].append((u, weight))
+        if self._out_index is not None:
+            self._index_edge(u, v)
+        self._changed()
+        if weight is not None and weight < 0:
+            self._has_negative_weights = True
+
+    def _add_edges(self, u: str, edges: List[Tuple[str, Optional[float]]]):
+        # Пакетная вставка рёбер из u; веса уже проверены вызывающим кодом
+        if self._owned is not None:
+            # Граф делит данные с копией: сначала отделяются внешние словари
+            self._detach()
+        adjacency = self.adjacency_list
+        if u not in adjacency:
+            self.add_vertex(u)
+        for v, _ in edges:
+            if v not in adjacency:
+                self.add_vertex(v)
+        if self._owned is not None:
+            self._own(u)
+            for v, _ in edges:
+                self._own(v)
+        adjacency = self.adjacency_list
+        adjacency[u].extend(edges)
+        if not self.directed:
+            for v, w in edges:
+                adjacency[v].append((u, w))
+        if self._out_index is not None:
+            for v, _ in edges:
+                self._index_edge(u, v)
+        self._changed()
+        if self.weighted and any(w < 0 for _, w in edges):
+            self._has_negative_weights = True
 
     def remove_vertex(self, vertex: str):
         if vertex not in self.adjacency_list:
             raise GraphError(f"Vertex '{vertex}' does not exist.")
-        del self.adjacency_list[vertex]
 
-        for u in self.adjacency_list:
-            self.adjacency_list[u] = [pair for pair in self.adjacency_list[u] if pair[0] != vertex]
+        # Перестраиваются только списки соседей удаляемой вершины
+        self._detach()
+        self._neighbour_index()
+        for u in self._in_index[vertex]:
+            if u != vertex:
+                self._own(u)
+                self.adjacency_list[u] = [pair for pair in self.adjacency_list[u] if pair[0] != vertex]
+                del self._out_index[u][vertex]
+        if self.directed:
+            for v in self._out_index[vertex]:
+                if v != vertex:
+                    self._own(v)
+                    del self._in_index[v][vertex]
+            del self._in_index[vertex]
+
+        del self.adjacency_list[vertex]
+        del self._out_index[vertex]
+        if self._owned is not None:
+            self._owned.discard(vertex)
+        self._changed(removed=True)
 
     def remove_edge(self, u: str, v: str):
         if u not in self.adjacency_list or v not in self.adjacency_list:
             raise GraphError("One or both vertices do not exist.")
+        self._detach()
+        if v not in self._neighbour_index()[0][u]:
+            return
+        self._own(u)
+        self._own(v)
 
         self.adjacency_list[u] = [pair for pair in self.adjacency_list[u] if pair[0] != v]
-        if not self.directed:
+        del self._out_index[u][v]
+        if self.directed:
+            del self._in_index[v][u]
+        elif u != v:
             self.adjacency_list[v] = [pair for pair in self.adjacency_list[v] if pair[0] != u]
+            del self._out_index[v][u]
+        self._changed(removed=True)
+
+    def iter_edges(self) -> Iterator[Tuple[str, str, Optional[float]]]:
+        # Для неориентированного графа каждое ребро (и набор параллельных рёбер)
+        # выдаётся один раз — со стороны вершины, которая встречается раньше
+        if self.directed:
+            for u, edges in self.adjacency_list.items():
+                for v, w in edges:
+                    yield u, v, w
+            return
+
+        done = set()
+        for u, edges in self.adjacency_list.items():
+            seen = set()
+            for v, w in edges:
+                if v not in done and v not in seen:
+                    seen.add(v)
+                    yield u, v, w
+            done.add(u)
 
     def to_edge_list(self) -> List[Tuple[str, str, Optional[float]]]:
-        edges = []
-        visited = set()
-        for u in self.adjacency_list:
-            for v, w in self.adjacency_list[u]:
-                if self.directed or (u, v) not in visited and (v, u) not in visited:
-                    edges.append((u, v, w))
-                    visited.add((u, v))
-        return edges
+        return list(self.iter_edges())
 
     def export_to_file(self, filepath: str):
+        if self.weighted:
+            lines = (" ".join([u] + [f"{v}:{w}" for v, w in edges]) + "\n"
+                     for u, edges in self.adjacency_list.items())
+        else:
+            lines = (" ".join([u] + [v for v, _ in edges]) + "\n"
+                     for u, edges in self.adjacency_list.items())
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(f"{self.directed} {self.weighted}\n")
-            for u in self.adjacency_list:
-                edges = self.adjacency_list[u]
-                line = u
-                for v, w in edges:
-                    if self.weighted:
-                        line += f" {v}:{w}"
-                    else:
-                        line += f" {v}"
-                f.write(line + '\n')
+            f.writelines(lines)
 
     def __str__(self):
         result = [f"Graph(directed={self.directed}, weighted={self.weighted})"]
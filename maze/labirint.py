@@ -1,136 +1,738 @@
-import tkinter as tk
-from tkinter import filedialog
-import matplotlib.pyplot as plt
-import networkx as nx
-from queue import Queue
-import copy
+import argparse
+import heapq
+import json
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+from array import array
+from collections import deque
+from functools import partial
+
+# Стена — 0, проходимая клетка — 1
+_OPEN_TABLE = bytes(0 if ch == ord('#') else 1 for ch in range(256))
+
+
+def read_grid(filename):
+    # Лабиринт хранится плоским bytearray с рамкой из стен шириной в одну клетку:
+    # соседи клетки c — это c - 1, c + 1, c - stride, c + stride, без проверок границ
+    with open(filename, 'rb') as f:
+        lines = [line.strip() for line in f]
+    while lines and not lines[-1]:
+        lines.pop()
+
+    rows = len(lines)
+    cols = max((len(line) for line in lines), default=0)
+    stride = cols + 2
+    grid = bytearray(stride * (rows + 2))
+    start = end = None
+    for i, line in enumerate(lines):
+        base = (i + 1) * stride + 1
+        grid[base:base + len(line)] = line.translate(_OPEN_TABLE)
+        if start is None and b'S' in line:
+            start = base + line.index(b'S')
+        if end is None and b'E' in line:
+            end = base + line.index(b'E')
+    return grid, rows, cols, start, end
+
+
+class GridSearch(ABC):
+    """Базовый класс пошагового поиска по плоскому массиву клеток.
+
+    Клетки адресуются индексами в массиве с рамкой (см. read_grid).
+    Каждый шаг возвращает запись только о том, что он изменил; отмена шага
+    откатывает эту запись за O(размер изменения). Раз в checkpoint_interval
+    шагов сохраняется полное состояние для быстрого перехода к любому шагу.
+    """
+
+    label = ''
+
+    def __init__(self, grid, stride, start, end, checkpoint_interval=None):
+        self.grid = grid
+        self.stride = stride
+        self.start = start
+        self.end = end
+        # Не больше нескольких контрольных точек на лабиринт: память O(число клеток)
+        self.checkpoint_interval = checkpoint_interval or max(1024, len(grid) // 4)
+        self.reset()
 
+    def reset(self):
+        self.steps = 0
+        self.history = []
+        self.checkpoints = {}
+        self._initial_state()
+        self._mark_all_dirty()
 
-class MazeSolver:
-    def __init__(self, filename):
+    def _initial_state(self):
+        self.path_found = False
+        self.expanded = 0
+        self._reset_state()
 
-        self.maze, self.start, self.end = self.read_maze(filename)
-        self.rows = len(self.maze)
-        self.cols = len(self.maze[0])
-        self.graph = self.build_graph()
-        self.history = []
-        self.reset()
+    def take_dirty(self):
+        # Клетки, изменившиеся с прошлого вызова; None — изменилось всё состояние
+        cells = None if self.dirty_all else self.dirty
+        self.dirty = set()
+        self.dirty_all = False
+        return cells
 
-    def read_maze(self, filename):
-
-        with open(filename, 'r') as f:
-            lines = [line.strip() for line in f.readlines()]
-        maze = []
-        start = end = None
-        for i, line in enumerate(lines):
-            row = []
-            for j, ch in enumerate(line):
-                if ch == 'S':
-                    start = (i, j)
-                elif ch == 'E':
-                    end = (i, j)
-                row.append(ch)
-            maze.append(row)
-        return maze, start, end
-
-    def build_graph(self):
-        G = nx.Graph()
-        for i in range(self.rows):
-            for j in range(self.cols):
-                if self.maze[i][j] != '#':
-                    for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
-                        ni, nj = i + dx, j + dy
-                        if 0 <= ni < self.rows and 0 <= nj < self.cols:
-                            if self.maze[ni][nj] != '#':
-                                G.add_edge((i, j), (ni, nj))
-        return G
+    def _mark_all_dirty(self):
+        self.dirty = set()
+        self.dirty_all = True
 
-    def reset(self):
-        # Сброс состояния поиска до начального
-        self.visited = set()
-        self.queue = Queue()
-        self.queue.put(self.start)
-        self.visited.add(self.start)
-        self.parent = {}
-        self.path_found = False
+    def step(self):
+        if self.path_found:
+            return False
+        record = self._step()
+        if record is None:
+            return False
+        self.history.append(record)
+        self.steps += 1
+        if self.steps % self.checkpoint_interval == 0 and self.steps not in self.checkpoints:
+            self.checkpoints[self.steps] = self._capture()
+        return True
+
+    def undo(self):
+        if not self.history:
+            return False
+        self._undo(self.history.pop())
+        self.steps -= 1
+        return True
+
+    def goto_step(self, target):
+        target = max(0, target)
+        if target < self.steps:
+            if self.steps - target <= self.checkpoint_interval:
+                while self.steps > target:
+                    self.undo()
+            else:
+                base = max((k for k in self.checkpoints if k <= target), default=0)
+                if base:
+                    self._restore(self.checkpoints[base])
+                else:
+                    self._initial_state()
+                del self.history[base:]
+                self.steps = base
+                self._mark_all_dirty()
+        while self.steps < target and self.step():
+            pass
+
+    def solve(self):
+        # Полный поиск до конца; история шагов для отмены не сохраняется
+        while self.step():
+            pass
+        self._forget_history()
+        return self.path()
+
+    def _forget_history(self):
         self.history = []
+        self.checkpoints = {}
+        self.steps = 0
+        self._mark_all_dirty()
 
-    def save_state(self):
-        state = {
-            'visited': copy.deepcopy(self.visited),
-            'queue': copy.deepcopy(list(self.queue.queue)),
-            'parent': copy.deepcopy(self.parent),
-            'path_found': self.path_found
-        }
-        self.history.append(state)
+    def path(self):
+        if not self.path_found:
+            return []
+        return _unwind(self.parent, self.end)
 
-    def load_prev_state(self):
-        if not self.history:
-            return
-        state = self.history.pop()
-        self.visited = state['visited']
-        self.queue = Queue()
-        for item in state['queue']:
-            self.queue.put(item)
-        self.parent = state['parent']
-        self.path_found = state['path_found']
+    @abstractmethod
+    def _reset_state(self):
+        """Начальное состояние поиска: массивы посещений, предков и фронт."""
 
-    def bfs_step(self):
+    @abstractmethod
+    def _step(self):
+        """Один шаг поиска; запись об изменениях или None, если шагать больше некуда."""
 
-        if self.queue.empty() or self.path_found:
-            return
+    @abstractmethod
+    def _undo(self, record):
+        """Откат шага по записи, которую вернул _step."""
+
+    @abstractmethod
+    def _capture(self):
+        """Полное состояние для контрольной точки."""
+
+    @abstractmethod
+    def _restore(self, state):
+        """Возврат к состоянию, сохранённому _capture."""
+
+
+class GridBFS(GridSearch):
+    """Поиск в ширину: фронт — deque индексов, предки — массив int32.
 
-        self.save_state()
-        current = self.queue.get()
+    visited отмечает клетки, попавшие в очередь, closed — уже извлечённые из неё.
+    """
 
+    label = 'BFS'
+
+    def _reset_state(self):
+        size = len(self.grid)
+        self.visited = bytearray(size)
+        self.closed = bytearray(size)
+        self.parent = array('i', [-1]) * size
+        self.frontier = deque()
+        if self.start is not None:
+            self.frontier.append(self.start)
+            self.visited[self.start] = 1
+
+    def _step(self):
+        # Запись шага: (извлечённая клетка, добавленные в очередь клетки)
+        if not self.frontier:
+            return None
+
+        current = self.frontier.popleft()
+        self.closed[current] = 1
+        self.dirty.add(current)
+        self.expanded += 1
         if current == self.end:
             self.path_found = True
+            return current, ()
+
+        grid, visited, parent = self.grid, self.visited, self.parent
+        enqueued = []
+        for neighbor in (current - self.stride, current + self.stride, current - 1, current + 1):
+            if grid[neighbor] and not visited[neighbor]:
+                visited[neighbor] = 1
+                parent[neighbor] = current
+                enqueued.append(neighbor)
+        self.frontier.extend(enqueued)
+        self.dirty.update(enqueued)
+        return current, tuple(enqueued)
+
+    def _undo(self, record):
+        current, enqueued = record
+        for neighbor in enqueued:
+            self.frontier.pop()
+            self.visited[neighbor] = 0
+            self.parent[neighbor] = -1
+        self.dirty.update(enqueued)
+        self.dirty.add(current)
+        self.closed[current] = 0
+        self.frontier.appendleft(current)
+        self.expanded -= 1
+        self.path_found = False
+
+    def _capture(self):
+        return (bytes(self.visited), bytes(self.closed), array('i', self.parent), tuple(self.frontier),
+                self.path_found, self.expanded)
+
+    def _restore(self, state):
+        visited, closed, parent, frontier, self.path_found, self.expanded = state
+        self.visited, self.closed = bytearray(visited), bytearray(closed)
+        self.parent, self.frontier = array('i', parent), deque(frontier)
+
+    def solve(self):
+        # Полный поиск без записи истории шагов (история отмены сбрасывается)
+        grid, visited, closed, parent, frontier = self.grid, self.visited, self.closed, self.parent, self.frontier
+        offsets = (-self.stride, self.stride, -1, 1)
+        end = self.end
+        expanded = 0
+        while frontier and not self.path_found:
+            current = frontier.popleft()
+            closed[current] = 1
+            expanded += 1
+            if current == end:
+                self.path_found = True
+                break
+            for offset in offsets:
+                neighbor = current + offset
+                if grid[neighbor] and not visited[neighbor]:
+                    visited[neighbor] = 1
+                    parent[neighbor] = current
+                    frontier.append(neighbor)
+        self.expanded += expanded
+        self._forget_history()
+        return self.path()
+
+
+class GridBidirectionalBFS(GridSearch):
+    """Двунаправленный поиск в ширину от старта и от финиша.
+
+    За шаг раскрывается одна клетка той стороны, чей фронт меньше. Поиск
+    останавливается, когда ни один ещё не найденный путь не может быть
+    короче лучшего найденного стыка двух деревьев.
+    """
+
+    label = 'Bidirectional BFS'
+
+    def _reset_state(self):
+        size = len(self.grid)
+        self.visited = bytearray(size)
+        self.closed = bytearray(size)
+        # side: 1 — клетка найдена от старта, 2 — от финиша
+        self.side = bytearray(size)
+        self.parent = array('i', [-1]) * size
+        self.parent_back = array('i', [-1]) * size
+        self.dist = (None, array('i', [-1]) * size, array('i', [-1]) * size)
+        self.frontiers = (None, deque(), deque())
+        self.best = None
+        self.meeting = None
+        if self.start is None or self.end is None:
             return
+        for side, cell in ((1, self.start), (2, self.end)):
+            self.side[cell] = side
+            self.visited[cell] = 1
+            self.dist[side][cell] = 0
+            self.frontiers[side].append(cell)
+        if self.start == self.end:
+            self.best, self.meeting = 0, (self.start, self.end)
+            self.path_found = True
 
-        for neighbor in self.graph.neighbors(current):
-            if neighbor not in self.visited:
-                self.queue.put(neighbor)
-                self.visited.add(neighbor)
-                self.parent[neighbor] = current
+    def _step(self):
+        forward, backward = self.frontiers[1], self.frontiers[2]
+        if not forward or not backward:
+            return None
+
+        side = 1 if len(forward) <= len(backward) else 2
+        frontier, dist = self.frontiers[side], self.dist[side]
+        parent = self.parent if side == 1 else self.parent_back
+        other_dist = self.dist[3 - side]
+        record = (side, self.best, self.meeting)
+
+        current = frontier.popleft()
+        self.closed[current] = 1
+        self.dirty.add(current)
+        self.expanded += 1
+
+        enqueued = []
+        for neighbor in (current - self.stride, current + self.stride, current - 1, current + 1):
+            if not self.grid[neighbor]:
+                continue
+            if not self.side[neighbor]:
+                self.side[neighbor] = side
+                self.visited[neighbor] = 1
+                parent[neighbor] = current
+                dist[neighbor] = dist[current] + 1
+                enqueued.append(neighbor)
+            elif self.side[neighbor] != side:
+                length = dist[current] + 1 + other_dist[neighbor]
+                if self.best is None or length < self.best:
+                    self.best = length
+                    self.meeting = (current, neighbor) if side == 1 else (neighbor, current)
+        frontier.extend(enqueued)
+        self.dirty.update(enqueued)
+
+        if self.best is not None:
+            forward, backward = self.frontiers[1], self.frontiers[2]
+            if (not forward or not backward
+                    or self.dist[1][forward[0]] + self.dist[2][backward[0]] + 1 >= self.best):
+                self.path_found = True
+        return record + (current, tuple(enqueued))
+
+    def _undo(self, record):
+        side, self.best, self.meeting, current, enqueued = record
+        frontier = self.frontiers[side]
+        parent = self.parent if side == 1 else self.parent_back
+        for neighbor in enqueued:
+            frontier.pop()
+            self.side[neighbor] = 0
+            self.visited[neighbor] = 0
+            parent[neighbor] = -1
+            self.dist[side][neighbor] = -1
+        self.dirty.update(enqueued)
+        self.dirty.add(current)
+        self.closed[current] = 0
+        frontier.appendleft(current)
+        self.expanded -= 1
+        self.path_found = False
 
-    def reconstruct_path(self):
-        path = []
+    def _capture(self):
+        return (bytes(self.visited), bytes(self.closed), bytes(self.side),
+                array('i', self.parent), array('i', self.parent_back),
+                array('i', self.dist[1]), array('i', self.dist[2]),
+                tuple(self.frontiers[1]), tuple(self.frontiers[2]),
+                self.best, self.meeting, self.path_found, self.expanded)
+
+    def _restore(self, state):
+        (visited, closed, side, parent, parent_back, dist_forward, dist_backward,
+         forward, backward, self.best, self.meeting, self.path_found, self.expanded) = state
+        self.visited, self.closed, self.side = bytearray(visited), bytearray(closed), bytearray(side)
+        self.parent, self.parent_back = array('i', parent), array('i', parent_back)
+        self.dist = (None, array('i', dist_forward), array('i', dist_backward))
+        self.frontiers = (None, deque(forward), deque(backward))
+
+    def path(self):
         if not self.path_found:
-            return path
-        node = self.end
-        while node != self.start:
-            path.append(node)
-            node = self.parent[node]
-        path.append(self.start)
-        return list(reversed(path))
+            return []
+        forward_cell, backward_cell = self.meeting
+        if forward_cell == backward_cell:
+            return [forward_cell]
+        return _unwind(self.parent, forward_cell) + _unwind(self.parent_back, backward_cell)[::-1]
+
+
+class GridAStar(GridSearch):
+    """A* с манхэттенской эвристикой; открытый список — двоичная куча.
+
+    Подклассы переопределяют _successors, чтобы менять набор рёбер поиска.
+    """
+
+    label = 'A*'
+
+    def _reset_state(self):
+        size = len(self.grid)
+        self.visited = bytearray(size)
+        self.closed = bytearray(size)
+        self.parent = array('i', [-1]) * size
+        self.g = array('i', [-1]) * size
+        self.heap = []
+        if self.start is not None and self.end is not None:
+            self.end_row, self.end_col = divmod(self.end, self.stride)
+            self.visited[self.start] = 1
+            self.g[self.start] = 0
+            h = self._heuristic(self.start)
+            self.heap.append((h, h, self.start))
+
+    def _heuristic(self, cell):
+        row, col = divmod(cell, self.stride)
+        return abs(row - self.end_row) + abs(col - self.end_col)
+
+    def _successors(self, current):
+        grid = self.grid
+        return [(neighbor, 1)
+                for neighbor in (current - self.stride, current + self.stride, current - 1, current + 1)
+                if grid[neighbor]]
+
+    def _step(self):
+        # Запись шага: (извлечённые из кучи элементы, добавленные элементы, изменённые клетки)
+        heap, closed = self.heap, self.closed
+        popped = []
+        while heap and closed[heap[0][2]]:
+            popped.append(heapq.heappop(heap))
+        if not heap:
+            for item in popped:
+                heapq.heappush(heap, item)
+            return None
+
+        item = heapq.heappop(heap)
+        popped.append(item)
+        current = item[2]
+        closed[current] = 1
+        self.dirty.add(current)
+        self.expanded += 1
+        if current == self.end:
+            self.path_found = True
+            return popped, [], []
+
+        pushed, changed = [], []
+        g_current = self.g[current]
+        for neighbor, cost in self._successors(current):
+            if closed[neighbor]:
+                continue
+            g = g_current + cost
+            if not self.visited[neighbor] or g < self.g[neighbor]:
+                changed.append((neighbor, self.visited[neighbor], self.g[neighbor], self.parent[neighbor]))
+                self.visited[neighbor] = 1
+                self.g[neighbor] = g
+                self.parent[neighbor] = current
+                h = self._heuristic(neighbor)
+                entry = (g + h, h, neighbor)
+                heapq.heappush(heap, entry)
+                pushed.append(entry)
+                self.dirty.add(neighbor)
+        return popped, pushed, changed
+
+    def solve(self):
+        # Тот же поиск без записи изменений для отмены
+        heap, closed, visited, g_values, parent = self.heap, self.closed, self.visited, self.g, self.parent
+        successors, heuristic, end = self._successors, self._heuristic, self.end
+        expanded = 0
+        while heap and not self.path_found:
+            current = heapq.heappop(heap)[2]
+            if closed[current]:
+                continue
+            closed[current] = 1
+            expanded += 1
+            if current == end:
+                self.path_found = True
+                break
+            g_current = g_values[current]
+            for neighbor, cost in successors(current):
+                if closed[neighbor]:
+                    continue
+                g = g_current + cost
+                if not visited[neighbor] or g < g_values[neighbor]:
+                    visited[neighbor] = 1
+                    g_values[neighbor] = g
+                    parent[neighbor] = current
+                    h = heuristic(neighbor)
+                    heapq.heappush(heap, (g + h, h, neighbor))
+        self.expanded += expanded
+        self._forget_history()
+        return self.path()
+
+    def _undo(self, record):
+        popped, pushed, changed = record
+        if pushed:
+            # Удаление произвольных элементов из кучи требует перестройки: O(размер фронта)
+            for entry in pushed:
+                self.heap.remove(entry)
+            heapq.heapify(self.heap)
+        for neighbor, visited, g, parent in reversed(changed):
+            self.visited[neighbor] = visited
+            self.g[neighbor] = g
+            self.parent[neighbor] = parent
+            self.dirty.add(neighbor)
+        current = popped[-1][2]
+        self.closed[current] = 0
+        self.dirty.add(current)
+        for entry in popped:
+            heapq.heappush(self.heap, entry)
+        self.expanded -= 1
+        self.path_found = False
 
-    def draw(self):
-        plt.clf()
+    def _capture(self):
+        return (bytes(self.visited), bytes(self.closed), array('i', self.parent), array('i', self.g),
+                list(self.heap), self.path_found, self.expanded)
+
+    def _restore(self, state):
+        visited, closed, parent, g, heap, self.path_found, self.expanded = state
+        self.visited, self.closed = bytearray(visited), bytearray(closed)
+        self.parent, self.g, self.heap = array('i', parent), array('i', g), list(heap)
+
+
+class GridJPS(GridAStar):
+    """Поиск с прыжками (jump point search) для 4-связной сетки с единичными весами.
+
+    Из каждой раскрытой клетки поиск «прыгает» по прямой до ближайшей точки
+    прыжка, поэтому в открытый список попадают только развилки и повороты.
+    """
+
+    label = 'JPS'
+
+    def _successors(self, current):
+        grid, stride = self.grid, self.stride
+        parent = self.parent[current]
+        if parent == -1:
+            directions = (-stride, stride, -1, 1)
+        else:
+            delta = current - parent
+            step = (delta > 0) - (delta < 0)
+            if -stride < delta < stride:
+                directions = (-stride, stride, step)
+            else:
+                directions = (-1, 1, step * stride)
+
+        successors = []
+        for direction in directions:
+            if not grid[current + direction]:
+                continue
+            jump_point = self._jump(current + direction, direction)
+            if jump_point != -1:
+                successors.append((jump_point, self._distance(current, jump_point)))
+        return successors
+
+    def _jump(self, cell, direction):
+        if direction in (1, -1):
+            return self._jump_horizontal(cell, direction)
+        grid, end = self.grid, self.end
+        while grid[cell]:
+            if cell == end:
+                return cell
+            left, right = cell - 1, cell + 1
+            if (grid[left] and not grid[left - direction]) or (grid[right] and not grid[right - direction]):
+                return cell
+            if self._jump_horizontal(right, 1) != -1 or self._jump_horizontal(left, -1) != -1:
+                return cell
+            cell += direction
+        return -1
+
+    def _jump_horizontal(self, cell, direction):
+        grid, end, stride = self.grid, self.end, self.stride
+        while grid[cell]:
+            if cell == end:
+                return cell
+            up, down = cell - stride, cell + stride
+            if (grid[up] and not grid[up - direction]) or (grid[down] and not grid[down - direction]):
+                return cell
+            cell += direction
+        return -1
+
+    def _distance(self, a, b):
+        row_a, col_a = divmod(a, self.stride)
+        row_b, col_b = divmod(b, self.stride)
+        return abs(row_a - row_b) + abs(col_a - col_b)
+
+    def path(self):
+        # Между точками прыжка клетки пути лежат на одной прямой
+        jump_points = super().path()
+        path = jump_points[:1]
+        for a, b in zip(jump_points, jump_points[1:]):
+            direction = self.stride if abs(b - a) >= self.stride else 1
+            if b < a:
+                direction = -direction
+            path.extend(range(a + direction, b + direction, direction))
+        return path
+
+
+SEARCH_STRATEGIES = {
+    'bfs': GridBFS,
+    'astar': GridAStar,
+    'bidirectional': GridBidirectionalBFS,
+    'jps': GridJPS,
+}
+
+
+def _unwind(parent, cell):
+    path = []
+    while cell != -1:
+        path.append(cell)
+        cell = parent[cell]
+    path.reverse()
+    return path
+
+
+# Значение по умолчанию set_algorithm: оставить начало и конец текущего движка
+_KEEP_ENDPOINTS = object()
 
-        pos = {node: (node[1], -node[0]) for node in self.graph.nodes()}
-        nx.draw(self.graph, pos, node_size=500, node_color='lightgray', with_labels=False)
 
-        labels = {}
-        for (i, j), ch in [((i, j), self.maze[i][j]) for i in range(self.rows) for j in range(self.cols)]:
-            if ch != '#':
-                labels[(i, j)] = ch
-        nx.draw_networkx_labels(self.graph, pos, labels)
+class MazeSolver:
+    def __init__(self, filename, algorithm='bfs'):
+
+        self.grid, self.rows, self.cols, start, end = read_grid(filename)
+        self.stride = self.cols + 2
+        self.set_algorithm(algorithm, start, end)
+        self.start = self.to_coords(start) if start is not None else None
+        self.end = self.to_coords(end) if end is not None else None
+        self.renderer = None
+        self.reset()
 
+    def set_algorithm(self, algorithm, start=_KEEP_ENDPOINTS, end=_KEEP_ENDPOINTS):
+        # start и end — номера клеток; None — клетки S или E в лабиринте нет
+        if algorithm not in SEARCH_STRATEGIES:
+            raise ValueError(f"Неизвестный алгоритм поиска: '{algorithm}'.")
+        if start is _KEEP_ENDPOINTS:
+            start = self.engine.start
+        if end is _KEEP_ENDPOINTS:
+            end = self.engine.end
+        self.algorithm = algorithm
+        self.engine = SEARCH_STRATEGIES[algorithm](self.grid, self.stride, start, end)
 
-        nx.draw_networkx_nodes(self.graph, pos, nodelist=list(self.visited), node_color='yellow')
+    @property
+    def expanded(self):
+        return self.engine.expanded
 
+    def to_coords(self, cell):
+        i, j = divmod(cell, self.stride)
+        return i - 1, j - 1
 
-        if self.path_found:
-            path = self.reconstruct_path()
-            nx.draw_networkx_nodes(self.graph, pos, nodelist=path, node_color='green')
-            nx.draw_networkx_edges(self.graph, pos, edgelist=list(zip(path, path[1:])), edge_color='green', width=2)
+    def to_cell(self, coords):
+        return (coords[0] + 1) * self.stride + coords[1] + 1
 
-        plt.title("Maze Solver - BFS")
-        plt.pause(0.01)
+    @property
+    def path_found(self):
+        return self.engine.path_found
+
+    @property
+    def visited(self):
+        return {self.to_coords(c) for c, seen in enumerate(self.engine.visited) if seen}
+
+    def reset(self):
+        # Сброс состояния поиска до начального
+        self.engine.reset()
+
+    def load_prev_state(self):
+        self.engine.undo()
+
+    def bfs_step(self):
+        self.engine.step()
+
+    def goto_step(self, step):
+        self.engine.goto_step(step)
+
+    def solve(self):
+        return [self.to_coords(c) for c in self.engine.solve()]
+
+    def reconstruct_path(self):
+        return [self.to_coords(c) for c in self.engine.path()]
+
+    def draw(self):
+        if self.renderer is None:
+            self.renderer = MazeRenderer(self)
+        self.renderer.update()
+
+
+class MazeRenderer:
+    """Отрисовка лабиринта картинкой imshow.
+
+    Статичный лабиринт рисуется один раз; на каждом шаге перекрашиваются
+    только клетки, изменённые поиском, и обновляется линия найденного пути.
+    """
+
+    COLORS = {
+        'wall': (0.2, 0.2, 0.2),
+        'open': (0.92, 0.92, 0.92),
+        'frontier': (1.0, 0.85, 0.2),
+        'closed': (1.0, 1.0, 0.55),
+    }
+
+    def __init__(self, solver, ax=None):
+        import numpy as np
+        import matplotlib.pyplot as plt
+        self.np = np
+        self.solver = solver
+        if ax is None:
+            plt.figure("Maze Solver")
+            ax = plt.gca()
+        self.ax = ax
+
+        rows, cols, stride = solver.rows, solver.cols, solver.stride
+        grid = np.frombuffer(bytes(solver.grid), dtype=np.uint8).reshape(rows + 2, stride)[1:-1, 1:-1]
+        self.walls = grid == 0
+        self.image = np.empty((rows, cols, 3))
+        self.image[:] = self.COLORS['open']
+        self.image[self.walls] = self.COLORS['wall']
+
+        ax.clear()
+        self.artist = ax.imshow(self.image, interpolation='nearest')
+        ax.set_xticks([])
+        ax.set_yticks([])
+        for coords, label in ((solver.start, 'S'), (solver.end, 'E')):
+            if coords is not None:
+                ax.text(coords[1], coords[0], label, ha='center', va='center',
+                        fontweight='bold', color='blue')
+        self.path_line, = ax.plot([], [], color='green', linewidth=2)
+
+    def update(self):
+        engine = self.solver.engine
+        cells = engine.take_dirty()
+        if cells is None:
+            self._repaint_all(engine)
+        else:
+            for cell in cells:
+                i, j = self.solver.to_coords(cell)
+                self.image[i, j] = self._color(engine, cell)
+
+        path = self.solver.reconstruct_path()
+        self.path_line.set_data([j for _, j in path], [i for i, _ in path])
+        self.artist.set_data(self.image)
+        self.ax.set_title(f"Maze Solver - {engine.label}, шаг {engine.steps}, раскрыто {engine.expanded}")
+        figure = self.ax.figure
+        figure.canvas.draw_idle()
+        figure.canvas.flush_events()
+
+    def _color(self, engine, cell):
+        if engine.closed[cell]:
+            return self.COLORS['closed']
+        if engine.visited[cell]:
+            return self.COLORS['frontier']
+        return self.COLORS['open']
+
+    def _repaint_all(self, engine):
+        np = self.np
+        rows, cols, stride = self.solver.rows, self.solver.cols, self.solver.stride
+
+        def layer(data):
+            return np.frombuffer(bytes(data), dtype=np.uint8).reshape(rows + 2, stride)[1:-1, 1:-1] != 0
+
+        self.image[:] = self.COLORS['open']
+        self.image[layer(engine.visited)] = self.COLORS['frontier']
+        self.image[layer(engine.closed)] = self.COLORS['closed']
+        self.image[self.walls] = self.COLORS['wall']
 
 
 class MazeApp:
     def __init__(self, root, filename):
+        # Tk и matplotlib нужны только интерфейсу, пакетный режим их не импортирует
+        import tkinter as tk
+        import matplotlib.pyplot as plt
         self.root = root
         self.solver = MazeSolver(filename)
         self.root.title("Maze Visualizer")
@@ -152,6 +754,23 @@ class MazeApp:
         self.reset_btn.pack(side=tk.LEFT, padx=10, pady=10)
 
 
+        # Воспроизведение: за один кадр выполняется заданное число шагов
+        tk.Label(root, text="Шагов за кадр:").pack(side=tk.LEFT)
+        self.batch_var = tk.IntVar(value=10)
+        self.batch_spin = tk.Spinbox(root, from_=1, to=100000, width=7, textvariable=self.batch_var)
+        self.batch_spin.pack(side=tk.LEFT, padx=5)
+
+        self.play_btn = tk.Button(root, text="▶ Пуск", command=self.toggle_play)
+        self.play_btn.pack(side=tk.LEFT, padx=10, pady=10)
+        self.playing = False
+
+
+        self.algorithm_var = tk.StringVar(value=self.solver.algorithm)
+        self.algorithm_menu = tk.OptionMenu(root, self.algorithm_var, *SEARCH_STRATEGIES,
+                                            command=self.change_algorithm)
+        self.algorithm_menu.pack(side=tk.LEFT, padx=10, pady=10)
+
+
         plt.ion()
         self.solver.draw()
 
@@ -160,6 +779,37 @@ class MazeApp:
         self.solver.bfs_step()
         self.solver.draw()
 
+    def toggle_play(self):
+        self.playing = not self.playing
+        self.play_btn.config(text="⏸ Пауза" if self.playing else "▶ Пуск")
+        if self.playing:
+            self.play_frame()
+
+    def play_frame(self):
+        if not self.playing:
+            return
+        from tkinter import TclError
+        try:
+            batch = max(1, self.batch_var.get())
+        except TclError:
+            batch = 1
+        progressed = False
+        for _ in range(batch):
+            if not self.solver.engine.step():
+                break
+            progressed = True
+        self.solver.draw()
+        if progressed and not self.solver.path_found:
+            self.root.after(1, self.play_frame)
+        else:
+            self.toggle_play()
+
+    def change_algorithm(self, algorithm):
+        self.playing = False
+        self.play_btn.config(text="▶ Пуск")
+        self.solver.set_algorithm(algorithm)
+        self.solver.draw()
+
     def prev_step(self):
 
         self.solver.load_prev_state()
@@ -171,8 +821,102 @@ class MazeApp:
         self.solver.draw()
 
 
-if __name__ == "__main__":
-    filename = "input.txt"
+def solve_file(filename, algorithm='bfs', with_path=True):
+    """Решает лабиринт из файла без графического интерфейса.
+
+    Возвращает словарь с длиной пути в ходах (None, если пути нет), числом
+    раскрытых клеток и, при with_path=True, самим путём в координатах (строка, столбец).
+    Ошибки чтения и разбора попадают в поле 'error', а не прерывают пакетную обработку.
+    """
+    result = {'file': filename, 'algorithm': algorithm}
+    started = time.perf_counter()
+    try:
+        grid, rows, cols, start, end = read_grid(filename)
+    except OSError as e:
+        result['error'] = str(e)
+        return result
+    if start is None or end is None:
+        result['error'] = "В лабиринте нет начальной (S) или конечной (E) клетки."
+        return result
+
+    stride = cols + 2
+    engine = SEARCH_STRATEGIES[algorithm](grid, stride, start, end)
+    path = engine.solve()
+    result['cells'] = rows * cols
+    result['length'] = len(path) - 1 if path else None
+    result['expanded'] = engine.expanded
+    if with_path:
+        result['path'] = [[c // stride - 1, c % stride - 1] for c in path]
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def solve_batch(filenames, algorithm='bfs', workers=None, with_path=True, chunksize=16):
+    """Решает много лабиринтов в пуле процессов.
+
+    Результаты выдаются потоково и в порядке filenames; workers=1 — без пула.
+    """
+    if algorithm not in SEARCH_STRATEGIES:
+        raise ValueError(f"Неизвестный алгоритм поиска: '{algorithm}'.")
+    task = partial(solve_file, algorithm=algorithm, with_path=with_path)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(filenames) <= 1:
+        yield from map(task, filenames)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(task, filenames, chunksize=chunksize)
+
+
+def run_batch(filenames, output, algorithm='bfs', workers=None, with_path=True):
+    # Результаты пишутся построчно в JSON Lines, статистика возвращается словарём
+    started = time.perf_counter()
+    stats = {'mazes': 0, 'solved': 0, 'unsolved': 0, 'errors': 0, 'cells': 0, 'expanded': 0}
+    with open(output, 'w', encoding='utf-8') as out:
+        for result in solve_batch(filenames, algorithm, workers, with_path):
+            out.write(json.dumps(result, ensure_ascii=False))
+            out.write('\n')
+            stats['mazes'] += 1
+            if 'error' in result:
+                stats['errors'] += 1
+                continue
+            stats['solved' if result['length'] is not None else 'unsolved'] += 1
+            stats['cells'] += result['cells']
+            stats['expanded'] += result['expanded']
+    elapsed = time.perf_counter() - started
+    stats['seconds'] = elapsed
+    stats['mazes_per_second'] = stats['mazes'] / elapsed if elapsed else 0.0
+    stats['cells_per_second'] = stats['cells'] / elapsed if elapsed else 0.0
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Поиск пути в лабиринте.")
+    parser.add_argument('files', nargs='*', help="файлы лабиринтов (по умолчанию input.txt)")
+    parser.add_argument('--batch', action='store_true', help="решить все файлы без интерфейса")
+    parser.add_argument('-o', '--output', default='results.jsonl', help="файл результатов (JSON Lines)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="число процессов")
+    parser.add_argument('-a', '--algorithm', choices=list(SEARCH_STRATEGIES), default='bfs')
+    parser.add_argument('--no-paths', action='store_true', help="не сохранять сами пути")
+    args = parser.parse_args(argv)
+
+    if args.batch:
+        if not args.files:
+            parser.error("для --batch нужен хотя бы один файл")
+        stats = run_batch(args.files, args.output, args.algorithm, args.workers, not args.no_paths)
+        print(f"Лабиринтов: {stats['mazes']} (решено {stats['solved']}, без пути {stats['unsolved']}, "
+              f"ошибок {stats['errors']}) за {stats['seconds']:.2f} с: "
+              f"{stats['mazes_per_second']:.1f} лабиринтов/с, {stats['cells_per_second']:.0f} клеток/с",
+              file=sys.stderr)
+        return
+
+    import tkinter as tk
+    filename = args.files[0] if args.files else "input.txt"
     root = tk.Tk()
     app = MazeApp(root, filename)
     root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,171 @@
+import hashlib
+import json
+import os
+import weakref
+
 import networkx as nx
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.patches import Patch
 from matplotlib.lines import Line2D
 import matplotlib.widgets as widgets
 
-def visualize_steps(graph, steps, draw_step_fn, pos=None):
+# Начиная с этого числа вершин вместо spring_layout используется быстрая спектральная раскладка
+FAST_LAYOUT_THRESHOLD = 500
+# Подписи вершин и весов рёбер рисуются только для небольших графов
+LABEL_LIMIT = 200
+# Сколько раскладок хранить в каталоге кэша: при записи новой самые старые удаляются
+LAYOUT_CACHE_MAX_FILES = 64
+
+# Раскладки в памяти: граф -> (версия графа, метод, позиции)
+_layouts = weakref.WeakKeyDictionary()
+
+
+def default_layout_cache_dir():
+    """Каталог кэша раскладок: $XDG_CACHE_HOME/tg-layouts или ~/.cache/tg-layouts."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'tg-layouts')
+
+
+def graph_layout(graph, method='auto', cache_dir=None, seed=0):
+    """Позиции вершин {вершина: (x, y)} с кэшированием.
+
+    В памяти раскладка хранится до изменения графа (graph.version). Если задан
+    cache_dir, она сохраняется и на диск по хешу содержимого графа, так что повторный
+    запуск на том же файле её не пересчитывает; в каталоге остаются только
+    LAYOUT_CACHE_MAX_FILES последних раскладок.
+    method: 'spring', 'spectral' или 'auto' (spectral для больших графов).
+    """
+    if method == 'auto':
+        method = 'spectral' if len(graph.adjacency_list) >= FAST_LAYOUT_THRESHOLD else 'spring'
+    if method not in ('spring', 'spectral'):
+        raise ValueError(f"Неизвестный метод раскладки: '{method}'.")
+
+    cached = _layouts.get(graph)
+    if cached is not None and cached[:2] == (graph.version, method):
+        return cached[2]
+
+    path = None
+    if cache_dir is not None:
+        path = os.path.join(cache_dir, f"{_content_hash(graph, method, seed)}.json")
+        try:
+            with open(path, encoding='utf-8') as f:
+                pos = {v: tuple(xy) for v, xy in json.load(f).items()}
+        except (OSError, ValueError):
+            pos = None
+        if pos is not None and pos.keys() == graph.adjacency_list.keys():
+            _layouts[graph] = (graph.version, method, pos)
+            _touch(path)
+            return pos
+
+    if method == 'spring':
+        pos = {v: tuple(xy) for v, xy in nx.spring_layout(_to_networkx(graph), seed=seed).items()}
+    else:
+        pos = _spectral_layout(graph, seed)
+    _layouts[graph] = (graph.version, method, pos)
+
+    if path is not None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({v: [float(x), float(y)] for v, (x, y) in pos.items()}, f)
+            _prune_cache(cache_dir, LAYOUT_CACHE_MAX_FILES)
+        except OSError:
+            pass
+    return pos
+
+
+def _touch(path):
+    # Время изменения файла — время последнего использования раскладки
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _prune_cache(cache_dir, keep):
+    entries = [entry for entry in os.scandir(cache_dir) if entry.name.endswith('.json')]
+    if len(entries) <= keep:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[keep:]:
+        os.remove(entry.path)
+
+
+def _content_hash(graph, method, seed):
+    digest = hashlib.sha1(f"{method} {seed} {graph.directed}\n".encode('utf-8'))
+    for u in sorted(graph.adjacency_list):
+        edges = sorted(f"{v}:{w}" for v, w in graph.adjacency_list[u])
+        digest.update(f"{u}\0{' '.join(edges)}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _to_networkx(graph):
     G = nx.DiGraph() if graph.directed else nx.Graph()
+    G.add_nodes_from(graph.adjacency_list)
     for u in graph.adjacency_list:
         for v, w in graph.adjacency_list[u]:
             G.add_edge(u, v, weight=w)
+    return G
+
+
+def _spectral_layout(graph, seed=0, iterations=200):
+    # Степенной метод для матрицы случайного блуждания (I + D^-1 A) / 2 с исключением
+    # постоянного вектора: координаты — два самых гладких собственных вектора.
+    # Каждая итерация — O(V + E), без плотных матриц V x V
+    vertices = list(graph.adjacency_list)
+    n = len(vertices)
+    if n < 3:
+        return {v: (float(i), 0.0) for i, v in enumerate(vertices)}
+    index = {v: i for i, v in enumerate(vertices)}
+    src = np.fromiter((index[u] for u in vertices for _ in graph.adjacency_list[u]), dtype=np.int64)
+    dst = np.fromiter((index[v] for u in vertices for v, _ in graph.adjacency_list[u]), dtype=np.int64)
+    src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+    degree = np.bincount(src, minlength=n) + 1.0
+    sqrt_degree = np.sqrt(degree)[:, None]
 
+    x = np.random.default_rng(seed).random((n, 2))
+    for _ in range(iterations):
+        neighbours = np.stack([np.bincount(src, weights=x[dst, k], minlength=n) for k in (0, 1)], axis=1)
+        x = (x + neighbours / degree[:, None]) / 2
+        x -= (degree[:, None] * x).sum(axis=0) / degree.sum()
+        q, _ = np.linalg.qr(x * sqrt_degree)
+        x = q / sqrt_degree
+
+    x -= x.min(axis=0)
+    span = x.max(axis=0)
+    x = 2 * x / np.where(span > 0, span, 1) - 1
+    return {v: (float(px), float(py)) for v, (px, py) in zip(vertices, x)}
+
+
+def visualize_steps(graph, steps, draw_step_fn=None, pos=None, renderer=None, layout='auto', cache_dir=None):
+    """Пошаговый просмотр алгоритма.
+
+    renderer — объект с методами setup(ax, G, pos, total) и update(step, index, total):
+    рисует граф один раз и на каждом шаге меняет только цвета и подписи.
+    draw_step_fn(ax, G, pos, step, index, total) — прежний режим с полной перерисовкой.
+    Если не задано ни то, ни другое, используется DijkstraStepRenderer.
+    cache_dir передаётся в graph_layout для сохранения раскладки на диск.
+    """
+    if renderer is None and draw_step_fn is None:
+        renderer = DijkstraStepRenderer()
+    G = _to_networkx(graph)
     if pos is None:
-        pos = nx.spring_layout(G)
+        pos = graph_layout(graph, method=layout, cache_dir=cache_dir)
 
     fig, ax = plt.subplots(figsize=(8, 6))
     step_index = [0]
 
+    if renderer is not None:
+        renderer.setup(ax, G, pos, len(steps))
+
     def draw():
-        ax.clear()
-        draw_step_fn(ax, G, pos, steps[step_index[0]], step_index[0], len(steps))
-        fig.canvas.draw()
+        if renderer is not None:
+            renderer.update(steps[step_index[0]], step_index[0], len(steps))
+        else:
+            ax.clear()
+            draw_step_fn(ax, G, pos, steps[step_index[0]], step_index[0], len(steps))
+        fig.canvas.draw_idle()
 
     def next_step(event):
         if step_index[0] < len(steps) - 1:
@@ -41,6 +187,82 @@ def visualize_steps(graph, steps, draw_step_fn, pos=None):
     draw()
     plt.show()
 
+
+class DijkstraStepRenderer:
+    """Отрисовка шагов Дейкстры без пересоздания артистов.
+
+    Вершины и рёбра рисуются один раз в setup; update меняет цвета вершин,
+    цвета рёбер и текст подписей. Для графов больше LABEL_LIMIT вершин подписи
+    не создаются, а рёбра рисуются одной коллекцией линий без стрелок.
+    """
+
+    COLORS = {'unvisited': 'lightgray', 'visited': 'lightgreen', 'current': 'orange',
+              'edge': 'black', 'updated': 'red'}
+
+    def __init__(self, label_limit=LABEL_LIMIT):
+        self.label_limit = label_limit
+
+    def setup(self, ax, G, pos, total):
+        self.ax = ax
+        self.nodes = list(G.nodes())
+        self.edges = list(G.edges())
+        self.edge_index = {edge: i for i, edge in enumerate(self.edges)}
+        if not G.is_directed():
+            # В трассе ребро неориентированного графа может прийти в любом направлении
+            self.edge_index.update({(v, u): i for (u, v), i in list(self.edge_index.items())})
+        small = len(self.nodes) <= self.label_limit
+
+        self.node_artist = nx.draw_networkx_nodes(G, pos, ax=ax, node_color=self.COLORS['unvisited'],
+                                                  node_size=1200 if small else max(4, 20000 // len(self.nodes)))
+        # Стрелки FancyArrowPatch — отдельный артист на ребро; для больших графов одна LineCollection
+        self.edge_artist = nx.draw_networkx_edges(G, pos, ax=ax, edge_color=self.COLORS['edge'],
+                                                  arrows=G.is_directed() and small,
+                                                  width=1.0 if small else 0.3)
+        self.labels = nx.draw_networkx_labels(G, pos, ax=ax) if small else {}
+        if small and len(self.edges) <= self.label_limit:
+            nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'), ax=ax)
+        self.highlighted = []
+
+        ax.axis('off')
+        legend_elements = [
+            Patch(facecolor='lightgray', label='Непосещённая'),
+            Patch(facecolor='lightgreen', label='Посещённая'),
+            Patch(facecolor='orange', label='Текущая'),
+            Line2D([0], [0], color='red', lw=2, label='Обновлённое ребро')
+        ]
+        ax.legend(handles=legend_elements, loc='upper left')
+
+    def update(self, step, index, total):
+        visited, current = step['visited'], step['current']
+        colors = self.COLORS
+        self.node_artist.set_facecolor([
+            colors['current'] if node == current else colors['visited'] if node in visited else colors['unvisited']
+            for node in self.nodes])
+
+        self._color_edges([self.edge_index[e] for e in step.get('updated_edges', ()) if e in self.edge_index])
+
+        distances = step['distances']
+        for node, text in self.labels.items():
+            dist = distances.get(node, float('inf'))
+            text.set_text(f"{node}\n{dist if dist != float('inf') else '∞'}")
+        self.ax.set_title(f"Шаг {index + 1} из {total}")
+
+    def _color_edges(self, updated):
+        if isinstance(self.edge_artist, list):
+            # Стрелки: перекрашиваются только рёбра, выделенные на прошлом и текущем шаге
+            for i in self.highlighted:
+                self.edge_artist[i].set_color(self.COLORS['edge'])
+            for i in updated:
+                self.edge_artist[i].set_color(self.COLORS['updated'])
+        else:
+            colors = np.zeros((len(self.edges), 4))
+            colors[:, 3] = 1.0
+            if updated:
+                colors[updated] = (1.0, 0.0, 0.0, 1.0)
+            self.edge_artist.set_color(colors)
+        self.highlighted = updated
+
+
 def draw_dijkstra_step(ax, G, pos, step, index, total):
     labels = {}
     node_colors = []